@@ -1,7 +1,11 @@
 import glob
+import hashlib
 import json
-from typing import Generic, TypeVar
+import random
+from array import array
+from typing import Generic, Iterable, TypeVar
 from arcade import SpriteList, SpriteType
+from arcade.version import VERSION as ARCADE_VERSION
 
 
 VT = TypeVar("VT")
@@ -44,5 +48,98 @@ class ObjectDescriptionReader(Generic[VT]):
 
 
 class EvolutionSpriteList(SpriteList[SpriteType]):
+    # версия arcade, внутренние поля SpriteList которой меняет remove_many
+    # (_sprite_buffer_free_slots, _sprite_index_data, _sprite_index_slots)
+    REMOVE_MANY_ARCADE_VERSION = "3.0.0.dev25"
+
     def __repr__(self) -> str:
         return repr(self.sprite_list)
+
+    def remove_many(self, sprites: Iterable[SpriteType]) -> None:
+        """Удаляет спрайты за один проход по списку - SpriteList.remove проходит список для каждого спрайта."""
+
+        sprites = list(sprites)
+        removed_sprites = set(sprites)
+        # список проверяется до изменений, чтобы при ошибке он не остался удаленным частично
+        if len(removed_sprites) != len(sprites):
+            raise ValueError("Sprites to remove are repeated")
+        if any(x not in self.sprite_slot for x in removed_sprites):
+            raise ValueError("Sprite is not in the SpriteList")
+
+        # с другими версиями arcade внутреннее устройство SpriteList может отличаться
+        if ARCADE_VERSION != self.REMOVE_MANY_ARCADE_VERSION:
+            for sprite in sprites:
+                self.remove(sprite)
+            return
+
+        removed_slots = set()
+        for sprite in sprites:
+            slot = self.sprite_slot.pop(sprite)
+            sprite.sprite_lists.remove(self)
+            self._sprite_buffer_free_slots.append(slot)
+            if self.spatial_hash is not None:
+                self.spatial_hash.remove(sprite)
+            removed_slots.add(slot)
+
+        if len(removed_sprites) > 0:
+            self.sprite_list = [x for x in self.sprite_list if x not in removed_sprites]
+            # занятые слоты находятся в начале индексного буфера, его размер не меняется
+            index_data = [x for x in self._sprite_index_data[:self._sprite_index_slots] if x not in removed_slots]
+            index_data.extend([0] * (len(self._sprite_index_data) - len(index_data)))
+            self._sprite_index_data = array(self._sprite_index_data.typecode, index_data)
+            self._sprite_index_slots -= len(removed_sprites)
+            self._sprite_index_changed = True
+
+
+class CounterRandom(random.Random):
+    """
+    Счетчиковый генератор случайных чисел.
+    N-е число потока - функция ключа и N, поэтому потоки с разными ключами (мир, существо, тик, назначение)
+    не зависят друг от друга и от порядка, в котором их используют.
+    """
+
+    MASK = (1 << 64) - 1
+
+    def __init__(self, *key: int | str) -> None:
+        self.key = 0
+        self.counter = 0
+        super().__init__(key)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(key: {self.key}, counter: {self.counter})"
+
+    @staticmethod
+    def get_key(*parts: int | str) -> int:
+        """Сводит части ключа к 64-битному числу (hash() не подходит - для строк он меняется между запусками)."""
+
+        return int.from_bytes(hashlib.blake2b(repr(parts).encode(), digest_size = 8).digest(), "little")
+
+    def seed(self, key: tuple[int | str, ...] = (), version: int = 2) -> None:
+        self.key = self.get_key(*key)
+        self.counter = 0
+
+    def getstate(self) -> tuple[int, int]:
+        return self.key, self.counter
+
+    def setstate(self, state: tuple[int, int]) -> None:
+        self.key, self.counter = state
+
+    # https://prng.di.unimi.it/splitmix64.c
+    def next_uint64(self) -> int:
+        self.counter += 1
+        value = (self.key + self.counter * 0x9E3779B97F4A7C15) & self.MASK
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & self.MASK
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & self.MASK
+        return value ^ (value >> 31)
+
+    def random(self) -> float:
+        return (self.next_uint64() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k: int) -> int:
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+
+        bits = 0
+        for shift in range(0, k, 64):
+            bits |= self.next_uint64() << shift
+        return bits & ((1 << k) - 1)
@@ -39,6 +39,7 @@ DESCRIPTIONS_PATH = "resources/descriptions"
 WINDOW_DESCRIPTIONS_PATH = f"{DESCRIPTIONS_PATH}/window"
 WORLD_RESOURCE_DESCRIPTIONS_PATH = f"{DESCRIPTIONS_PATH}/world_resource"
 WORLD_DESCRIPTIONS_PATH = f"{DESCRIPTIONS_PATH}/world"
+TICK_PHASE_DESCRIPTIONS_PATH = f"{DESCRIPTIONS_PATH}/tick_phase"
 CREATURE_DESCRIPTIONS_PATH = f"{DESCRIPTIONS_PATH}/creature"
 GENOME_DESCRIPTIONS_PATH = f"{CREATURE_DESCRIPTIONS_PATH}/genome"
 CHROMOSOME_DESCRIPTIONS_PATH = f"{GENOME_DESCRIPTIONS_PATH}/chromosome"
@@ -51,6 +52,10 @@ ACTION_DESCRIPTIONS_PATH = f"{CREATURE_DESCRIPTIONS_PATH}/action"
 # tps - ticks per second
 MAX_TPS = 1000
 
+# реализация контейнера ресурсов (simulator.world_resource.RESOURCES_CLASSES)
+# "dict" - словарь, "vector" - массив numpy, индексируемый WorldResource
+RESOURCES_BACKEND = "dict"
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.1/howto/deployment/checklist/
 
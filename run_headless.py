@@ -0,0 +1,91 @@
+import argparse
+import gc
+import json
+import os
+import time
+
+# без окна и отрисовки - arcade не должен подключаться к дисплею
+os.environ["ARCADE_HEADLESS"] = "1"
+
+# noinspection PyUnresolvedReferences
+import configure_django
+from core.service.error_log import log_error_info
+from simulator.creature import Creature
+from simulator.world import World
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Запускает симуляцию без окна и ограничения tps.")
+    parser.add_argument("--ticks", type = int, default = 10000, help = "максимальное количество тиков")
+    parser.add_argument("--until-extinct", action = "store_true", help = "остановиться, когда не останется существ")
+    parser.add_argument(
+        "--max-creatures",
+        type = int,
+        default = 0,
+        help = "остановиться, когда существ станет не меньше этого количества (0 - не останавливаться)"
+    )
+    parser.add_argument("--output", default = "headless_result.json", help = "файл для результатов в json-формате")
+    return parser.parse_args()
+
+
+def get_stop_reason(world: World, arguments: argparse.Namespace) -> str | None:
+    stop_reason = None
+    if world.age >= arguments.ticks:
+        stop_reason = "ticks"
+    elif arguments.until_extinct and len(world.creatures) == 0:
+        stop_reason = "extinct"
+    elif 0 < arguments.max_creatures <= len(world.creatures):
+        stop_reason = "max_creatures"
+    return stop_reason
+
+
+def get_result(world: World, stop_reason: str | None, duration: float) -> dict:
+    return {
+        "world_id": world.id,
+        "seed": world.seed,
+        "stop_reason": stop_reason,
+        "age": world.age,
+        "duration": duration,
+        "tps": world.age / duration if duration > 0 else None,
+        "creatures": len(world.creatures),
+        "births": Creature.birth_counter,
+        "deaths": Creature.death_counter,
+        "non_viable": Creature.non_viable_counter,
+        "map_resources": {resource.formula: amount for resource, amount in world.resources_ledger.map.items()},
+        "creature_resources": {
+            resource.formula: amount for resource, amount in world.resources_ledger.creatures.items()
+        },
+        "tick_phases": {
+            name: {"calls": calls, "duration": phase_duration}
+            for name, (calls, phase_duration) in world.tick_pipeline.get_costs().items()
+        }
+    }
+
+
+def simulate() -> None:
+    arguments = parse_arguments()
+    gc.set_threshold(10000, 100, 100)
+
+    # центр мира в тех же координатах, что и при запуске с окном (start.py)
+    world = World((800 // 2, 600 // 2))
+    print(f"Зерно мира: {world.seed}")
+    stop_reason = None
+    start = time.perf_counter()
+    try:
+        world.start()
+        while (stop_reason := get_stop_reason(world, arguments)) is None:
+            world.on_update()
+        world.stop()
+    except Exception as error:
+        world.stop()
+        log_error_info(error)
+        raise error
+    finally:
+        duration = time.perf_counter() - start
+        with open(arguments.output, 'w') as file:
+            json.dump(get_result(world, stop_reason, duration), file, indent = 4)
+        print(f"Симуляция окончена. Мир: {world.id}. Возраст мира: {world.age}")
+
+
+if __name__ == "__main__":
+    simulate()
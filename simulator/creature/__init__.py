@@ -11,13 +11,13 @@ import pymunk
 from core import models
 from core.mixin import WorldObjectMixin
 from core.physic.creature import CreatureCharacteristics
-from core.service import ObjectDescriptionReader
+from core.service import CounterRandom, ObjectDescriptionReader
 from evolution import settings
 from simulator.creature.action import ActionInterface
 from simulator.creature.bodypart import AddToNonExistentStorageException, BodypartInterface, BodypartInterfaceClass, \
     RemoveFromNonExistentStorageException, StorageInterface
 from simulator.creature.genome import Genome
-from simulator.world_resource import ENERGY, Resources
+from simulator.world_resource import ENERGY, FIXED_POINT_SCALE, Resources, ResourcesBatch, to_fixed_point
 
 
 # https://adamj.eu/tech/2021/05/13/python-type-hints-how-to-fix-circular-imports/
@@ -62,21 +62,33 @@ class Creature(WorldObjectMixin, arcade.Sprite):
     default_texture = arcade.load_texture(image_path, hit_box_algorithm = arcade.hitbox.algo_detailed)
 
     # position - центр существа
-    def __init__(self, world: "World", parents: list["Creature"] | None, world_generation: bool = False) -> None:
+    # number - порядковый номер существа среди потомков родителей (или стартовых существ), появившихся в этот тик
+    def __init__(
+            self,
+            world: "World",
+            parents: list["Creature"] | None,
+            world_generation: bool = False,
+            number: int = 0
+    ) -> None:
         try:
             super().__init__(self.default_texture)
             self.__class__.counter += 1
             # ситуация без предков подразумевается только при генерации мира
             if parents is None and world_generation:
                 parents = []
+            # ключ существа для счетчикового генератора (World.get_random)
+            # выводится из ключей предков, а не из порядка создания существ, поэтому не зависит от порядка их обработки
+            self.random_key = CounterRandom.get_key(*(x.random_key for x in parents), world.age, number)
+            genome_random = world.get_random(self.random_key, world.age, "genome")
             # такая ситуация подразумевается только при генерации мира
             if world_generation:
-                genome = Genome.get_first_genome()
+                genome = Genome.get_first_genome(genome_random)
             else:
-                genome = parents[0].genome.get_child_genome(parents)
+                genome = parents[0].genome.get_child_genome(parents, genome_random)
 
             # общая инициализация
             self.world = world
+            # плитка, на которой находится существо (поддерживается миром - World.place_creature)
             self.tile: Union["WorldTile", None] = None
             # None == существо не стартовало (start()) в симуляции
             self.start_tick = None
@@ -146,8 +158,15 @@ class Creature(WorldObjectMixin, arcade.Sprite):
                 # все траты ресурсов из-за восстановительных процессов и метаболизма в течении тика добавлять сюда
                 # (забираются из хранилища, добавляются в returned_resources,
                 # а потом (через returned_resources) возвращаются в мир)
-                self.resources_loss_accumulated: Resources[float] = Resources[float]()
-                self.resources_loss: Resources[int] | None = None
+                # хранятся с фиксированной точкой (FIXED_POINT_SCALE), чтобы обходиться целочисленными операциями
+                self.resources_loss_accumulated: Resources[int] = Resources[int]()
+                self.resources_loss: Resources[int] = Resources[int]()
+                # ресурсы тела без энергии - от них считаются потери веществ (потери энергии считаются отдельно)
+                self.material_resources = self.resources.copy()
+                self.material_resources[ENERGY] = 0
+                # переиспользуемый контейнер для промежуточных расчетов действий и метаболизма,
+                # чтобы не создавать новые контейнеры каждый тик
+                self.metabolism_buffer = Resources[int]()
                 # todo: привязать к генам
                 # отношение количества регенерируемых ресурсов и энергии
                 # (сколько энергии стоит регенерация единицы ресурса)
@@ -178,21 +197,24 @@ class Creature(WorldObjectMixin, arcade.Sprite):
         return self._reproduction_resources
 
     def count_resources_loss(self) -> None:
-        resources_loss = self.resources * self.genome.effects.resources_loss_coeff
-        resources_loss[ENERGY] = sum(self.remaining_resources.values()) * self.genome.effects.metabolism
-        resources_loss *= self.action.duration
-        resources_loss += self.resources_loss_accumulated
+        duration = self.action.duration
+        resources_loss = self.resources_loss_accumulated
+        resources_loss.iadd_scaled(
+            self.material_resources,
+            self.genome.effects.resources_loss_coeff_fixed_point * duration
+        )
+        resources_loss[ENERGY] += (self.remaining_resources.total() * self.genome.effects.metabolism_fixed_point *
+                                   duration)
 
-        resources_loss_rounded = resources_loss.round()
-        self.resources_loss_accumulated = resources_loss - resources_loss_rounded
-        self.resources_loss = resources_loss_rounded
+        # целая часть теряется, дробная накапливается до следующего расчета
+        resources_loss.move_fixed_point_integer_part(self.resources_loss)
 
     @property
     def damage(self) -> Resources[int]:
         """Сумма урона всех частей тела существа."""
 
         if self._damage is None:
-            self._damage = Resources[int].sum(x.damage for x in self.bodyparts)
+            self._damage = ResourcesBatch.from_iterable(x.damage for x in self.bodyparts).sum()
         return self._damage
 
     @property
@@ -201,7 +223,9 @@ class Creature(WorldObjectMixin, arcade.Sprite):
         # ресурсы существа, без тех, что хранятся в хранилищах
 
         if self._remaining_resources is None:
-            self._remaining_resources = Resources[int].sum(x.remaining_resources for x in self.bodyparts)
+            self._remaining_resources = ResourcesBatch.from_iterable(
+                x.remaining_resources for x in self.bodyparts
+            ).sum()
         return self._remaining_resources
 
     def request_to_save_to_db(self) -> None:
@@ -238,6 +262,9 @@ class Creature(WorldObjectMixin, arcade.Sprite):
         if self.viable:
             self.alive = True
             self.__class__.birth_counter += 1
+            # с этого момента ресурсы существа находятся в мире
+            self.world.resources_ledger.creatures += self.remaining_resources
+            self.world.resources_ledger.creatures += self.storage.current
             self.characteristics = CreatureCharacteristics(self)
 
             self.prepare_physics()
@@ -282,7 +309,7 @@ class Creature(WorldObjectMixin, arcade.Sprite):
     def fertilize(self) -> None:
         # todo: переделать этот метод при добавлении полового размножения
         self.next_children = tuple(
-            Creature(self.world, [self]) for _ in range(self.genome.effects.children_amount)
+            Creature(self.world, [self], number = number) for number in range(self.genome.effects.children_amount)
         )
 
     # todo: добавить обработку случаев, когда существо прерывается во время выполнения действия
@@ -291,7 +318,6 @@ class Creature(WorldObjectMixin, arcade.Sprite):
         """Симулирует жизнедеятельность существа."""
 
         try:
-            self.tile = self.world.position_to_tile(self.position)
             match self.action.type:
                 case ActionInterface.Type.WAIT:
                     pass
@@ -315,7 +341,6 @@ class Creature(WorldObjectMixin, arcade.Sprite):
             self.transfer_resources()
             if self.alive:
                 self.update_physics()
-            self.tile = None
         except Exception as error:
             error.creature = self
             error.next_children = self.next_children
@@ -331,8 +356,8 @@ class Creature(WorldObjectMixin, arcade.Sprite):
 
     def can_consume(self) -> bool:
         can_consume = False
-        for resource, amount in self.storage.fullness.items():
-            if amount < 1.0 and resource != ENERGY:
+        for resource, capacity in self.storage.capacity.items():
+            if capacity > 0 and self.storage.fullness[resource] < 1.0 and resource != ENERGY:
                 can_consume = True
                 break
         return can_consume
@@ -340,20 +365,21 @@ class Creature(WorldObjectMixin, arcade.Sprite):
     def consume(self) -> None:
         """Симулирует потребление веществ существом."""
 
-        consumption_resources = self.genome.effects.consumption_amount * self.action.duration
-        consumption_resources[ENERGY] = 0
-        consumption_resource_sum = sum(consumption_resources.values())
-        consumption_limit = self.genome.effects.consumption_limit * self.action.duration
+        duration = self.action.duration
+        consumption_resources = self.metabolism_buffer.assign(self.genome.effects.material_consumption_amount)
+        consumption_resource_sum = self.genome.effects.material_consumption_sum * duration
+        consumption_limit = self.genome.effects.consumption_limit * duration
         if consumption_resource_sum > consumption_limit:
-            reduction_coeff = consumption_limit / consumption_resource_sum
-            consumption_resources *= reduction_coeff
-        consumption_resources.iround()
+            multiplier = consumption_limit / self.genome.effects.material_consumption_sum
+        else:
+            multiplier = duration
+        consumption_resources.imul_round(multiplier)
 
         # увеличивает запрос на получение ресурсов из мира
         self.requested_resources += consumption_resources
 
         # тратит энергию на попытку потребления ресурсов
-        self.resources_loss_accumulated[ENERGY] += sum(consumption_resources.values()) * 0.01
+        self.resources_loss_accumulated[ENERGY] += to_fixed_point(consumption_resources.total() * 0.01)
 
     def can_regenerate(self) -> bool:
         return (self.genome.effects.regeneration_amount * self.genome.effects.regeneration_amount_coeff > 0.0
@@ -365,26 +391,22 @@ class Creature(WorldObjectMixin, arcade.Sprite):
             self.genome.effects.regeneration_amount * self.genome.effects.regeneration_amount_coeff
             * self.action.duration
         )
-        regenerating_resources = Resources[int](
-            {resource: min(
-                regenerating_resource_amount,
-                # делается поправка на количество ресурса в хранилище существа
-                self.storage.current[resource]
-            ) for resource in self.regenerating_bodypart.damage}
-        )
-        energy_cost = (regenerating_resources[ENERGY] + sum(regenerating_resources.values()) *
+        # делается поправка на количество ресурса в хранилище существа
+        regenerating_resources = self.metabolism_buffer.assign(self.storage.current)
+        regenerating_resources.iminimum(regenerating_resource_amount)
+        # восстанавливаются только поврежденные ресурсы
+        regenerating_resources.imask(self.regenerating_bodypart.damage)
+        energy_cost = (regenerating_resources[ENERGY] + regenerating_resources.total() *
                        self.energy_regenerate_cost)
         # проверяется доступное количество энергии
         if (current_energy := self.storage.current[ENERGY]) < energy_cost:
-            reduction_coeff = current_energy / energy_cost
-            regenerating_resources *= reduction_coeff
-            regenerating_resources.iround()
+            regenerating_resources.imul_round(current_energy / energy_cost)
 
-        extra_resources = self.regenerating_bodypart.regenerate(regenerating_resources)
-        spent_resources = regenerating_resources - extra_resources
+        spent_resources = self.regenerating_bodypart.regenerate(regenerating_resources)
         self.storage.remove_resources(spent_resources)
         # тратит энергию на регенерацию
-        self.resources_loss_accumulated[ENERGY] += int(sum(spent_resources.values()) * self.energy_regenerate_cost)
+        self.resources_loss_accumulated[ENERGY] += (int(spent_resources.total() * self.energy_regenerate_cost) *
+                                                    FIXED_POINT_SCALE)
 
         self._regenerating_bodypart = None
 
@@ -406,7 +428,9 @@ class Creature(WorldObjectMixin, arcade.Sprite):
                             break
 
             if len(bodyparts) > 0:
-                random.shuffle(bodyparts)
+                # части тела упорядочиваются, так как порядок обхода множества зависит от адресов объектов
+                bodyparts.sort(key = lambda x: x.sort_key)
+                self.world.get_random(self.random_key, self.world.age, "regeneration").shuffle(bodyparts)
                 self._regenerating_bodypart = bodyparts[0]
             else:
                 self._regenerating_bodypart = None
@@ -430,7 +454,10 @@ class Creature(WorldObjectMixin, arcade.Sprite):
         """Симулирует размножение существа."""
 
         # трата ресурсов на воспроизведение тел потомков (попутные потери ресурсов)
-        self.resources_loss_accumulated += self.reproduction_resources * self.reproduction_lost_coeff
+        self.resources_loss_accumulated.iadd_scaled(
+            self.reproduction_resources,
+            to_fixed_point(self.reproduction_lost_coeff)
+        )
         # трата ресурсов на тела потомков
         self.storage.remove_resources(self.reproduction_resources)
 
@@ -467,12 +494,13 @@ class Creature(WorldObjectMixin, arcade.Sprite):
         offset_coeff = 0.5
         children_positions = []
         children_layers = self.get_children_layers()
+        rng = self.world.get_random(self.random_key, self.world.age, "children_positions")
         # располагает потомков равномерно по слоям
         for layer_number, children_in_layer in enumerate(children_layers):
             child_sector = math.pi * 2 / children_in_layer
             # сдвиг расположения первого/единственного потомка в слое,
             # чтобы первый/единственный потомок был не строго справа, а случайно на окружности
-            first_layer_child_offset = random.random() * math.pi * 2
+            first_layer_child_offset = rng.random() * math.pi * 2
             for number in range(children_in_layer):
                 offset_x = self.characteristics.radius * 2 * \
                            math.cos(child_sector * number + first_layer_child_offset) * \
@@ -530,18 +558,19 @@ class Creature(WorldObjectMixin, arcade.Sprite):
         и достаточности ресурсов существа и хранимых ресурсов.
         """
 
-        lack_resources = self.remaining_resources + self.storage.current
+        lack_resources = self.metabolism_buffer.assign(self.remaining_resources)
+        lack_resources += self.storage.current
         lack_resources -= self.resources_loss
-        for resource in self.resources:
-            if self.storage.capacity[resource] <= 0 or lack_resources[resource] < 0:
-                can_metabolize = False
-                break
-        else:
-            # todo: переделать проверку на наличие энергии после переработки хранения энергии
-            if self.storage.capacity[ENERGY] <= 0 or lack_resources[ENERGY] < 0:
-                can_metabolize = False
+        if lack_resources.is_nonnegative():
+            for resource in self.resources:
+                if self.storage.capacity[resource] <= 0:
+                    can_metabolize = False
+                    break
             else:
-                can_metabolize = True
+                # todo: переделать проверку на наличие энергии после переработки хранения энергии
+                can_metabolize = self.storage.capacity[ENERGY] > 0
+        else:
+            can_metabolize = False
 
         return can_metabolize
 
@@ -549,9 +578,10 @@ class Creature(WorldObjectMixin, arcade.Sprite):
         # todo: вынести энергетический обмен в отдельный метод при добавлении других способов, кроме фотосинтеза
         self.requested_resources[ENERGY] += int(self.genome.effects.consumption_amount[ENERGY] * self.action.duration)
 
-        lack_resources = Resources[int](
-            {resource: amount for resource, amount in
-             (self.storage.current - self.resources_loss).items() if amount < 0}
+        # остаются только недостающие ресурсы
+        lack_resources = self.metabolism_buffer.assign(self.storage.current).isub_clamped(
+            self.resources_loss,
+            maximum = 0
         )
 
         if len(lack_resources) > 0:
@@ -566,14 +596,13 @@ class Creature(WorldObjectMixin, arcade.Sprite):
                 self.returned_resources -= exception.resources
                 self.kill(self.DeathCause.MISSING_STORAGE)
 
-        self.resources_loss = None
-
     # https://ru.wikipedia.org/wiki/%D0%90%D1%83%D1%82%D0%BE%D1%84%D0%B0%D0%B3%D0%B8%D1%8F
     def autophage(self, lack_resources: Resources[int]) -> Resources[int]:
         """Существо попытается восполнить недостаток ресурсов в хранилище за счет частей тела."""
 
+        rng = self.world.get_random(self.random_key, self.world.age, "autophagy")
         while not self.body.destroyed and len(lack_resources) > 0:
-            bodypart = self.get_autophagic_bodypart(lack_resources)
+            bodypart = self.get_autophagic_bodypart(lack_resources, rng)
             damage = -lack_resources
             # коррекция урона с учетом наличия ресурсов в части тела
             for resource, amount in damage.items():
@@ -594,7 +623,7 @@ class Creature(WorldObjectMixin, arcade.Sprite):
                 self.returned_resources += exception.resources
         return lack_resources
 
-    def get_autophagic_bodypart(self, lack_resources: Resources[int]) -> BodypartInterfaceClass:
+    def get_autophagic_bodypart(self, lack_resources: Resources[int], rng: random.Random) -> BodypartInterfaceClass:
         bodyparts = []
         for bodypart in self.present_bodyparts:
             for resource, amount in lack_resources.items():
@@ -603,27 +632,26 @@ class Creature(WorldObjectMixin, arcade.Sprite):
                     bodyparts.append(bodypart)
                     break
 
-        random.shuffle(bodyparts)
+        bodyparts.sort(key = lambda x: x.sort_key)
+        rng.shuffle(bodyparts)
         return bodyparts[0]
 
     def transfer_resources(self) -> None:
         """Обмениваем ресурсами с миром."""
 
-        tile = self.world.position_to_tile(self.position)
+        tile = self.tile
 
+        # контейнеры запросов передаются хранилищу плиток и обнуляются им после обработки (TileStore),
+        # поэтому существо переиспользует их, не создавая новые
         # запрос на получение ресурсов делается, только если существо живо
         if self.alive:
-            tile.remove_resources_requests[self] = self.requested_resources
-            self.requested_resources = Resources[int]()
+            self.world.tile_store.request_resources(tile.id, self, self.requested_resources)
 
             extra = self.storage.extra
             self.storage.remove_resources(extra)
             self.returned_resources += extra
 
-        # энергия не может возвращаться в мир
-        self.returned_resources[ENERGY] = 0
-        tile.add_resources_requests[self] = self.returned_resources
-        self.returned_resources = Resources[int]()
+        self.world.tile_store.return_resources(tile.id, self.returned_resources)
 
     def update_physics(self) -> None:
         self.physics_body.mass = self.characteristics.mass
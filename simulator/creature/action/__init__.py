@@ -1,6 +1,5 @@
 import abc
 import enum
-import random
 from typing import Callable, TYPE_CHECKING, Type
 
 from core.mixin import ApplyDescriptorMixin, GetSubclassesMixin
@@ -56,7 +55,7 @@ class ActionInterface(GetSubclassesMixin["ActionInterface"], ApplyDescriptorMixi
 
         self.prepare()
         self.estimated_stop_tick = self.start_tick + self.duration
-        self.world.processing_creatures[self.estimated_stop_tick].add(self.creature)
+        self.world.scheduler.schedule(self.creature, self.estimated_stop_tick)
 
     def __repr__(self) -> str:
         return f"{self.name}: {self.duration}"
@@ -79,7 +78,8 @@ class ActionInterface(GetSubclassesMixin["ActionInterface"], ApplyDescriptorMixi
                    if (weight := action.get_weight(creature)) > 0 and action.can_perform(creature)}
 
         if len(actions) > 0:
-            next_action = random.choices(list(actions), list(actions.values()))[0](creature)
+            rng = creature.world.get_random(creature.random_key, creature.world.age, "action")
+            next_action = rng.choices(list(actions), list(actions.values()))[0](creature)
         else:
             next_action = cls.get_wait_action(creature)
         return next_action
@@ -116,7 +116,7 @@ class ActionInterface(GetSubclassesMixin["ActionInterface"], ApplyDescriptorMixi
         self.aborted = True
         self._stop_tick = self.creature.world
         self.aborted_duration = self.world.age - self.start_tick
-        self.world.processing_creatures[self.estimated_stop_tick].remove(self.creature)
+        self.world.scheduler.cancel(self.creature)
 
     @classmethod
     def get_weight(cls, creature: "Creature") -> float:
@@ -1,4 +1,6 @@
 import copy
+import dataclasses
+import functools
 import math
 import statistics
 from collections import defaultdict
@@ -8,7 +10,7 @@ from core.mixin import ApplyDescriptorMixin, GetSubclassesMixin
 from core.service import ObjectDescriptionReader
 from evolution import settings
 from simulator.creature.genome.chromosome.gene import BodypartGeneInterface, ResourceStorageGeneInterface
-from simulator.world_resource import RESOURCE_DICT, Resources, WorldResource
+from simulator.world_resource import RESOURCE_DICT, Resources, ResourcesLedger, WorldResource
 
 
 if TYPE_CHECKING:
@@ -24,6 +26,15 @@ bodypart_descriptors = ObjectDescriptionReader[dict]().read_folder_to_dict(
 )
 
 
+@dataclasses.dataclass(frozen = True, slots = True)
+class BodypartComposition:
+    """Неизменяемые характеристики, зависящие только от класса части тела и ее размера."""
+
+    resources: Resources[int]
+    extra_storage: Resources[int]
+    volume: float
+
+
 class BodypartInterface(GetSubclassesMixin["BodypartInterface"], ApplyDescriptorMixin):
     name = "bodypart_interface"
     # название интерфейса, определяющего часть тела
@@ -59,35 +70,64 @@ class BodypartInterface(GetSubclassesMixin["BodypartInterface"], ApplyDescriptor
         # уничтожена ли часть тела полностью
         self.destroyed = False
         self.damage = Resources[int]()
+        # resources и extra_storage общие для всех частей тела того же класса и размера и не изменяются
+        self.composition_info = self.get_composition(self.size_coeff)
         # ресурсы, находящиеся в неповрежденной части тела/необходимые для воспроизводства части тела
         # при размере (size_coeff) равном 1.0 соответствует composition
-        self.resources = Resources[int](
-            {RESOURCE_DICT[resource_name]: amount for resource_name, amount in self.composition.items()}
-        )
-        self.resources *= self.size_coeff
-        self.resources.iround()
-        for resource, amount in self.resources.items():
-            if amount == 0:
-                self.resources[resource] = 1
+        self.resources = self.composition_info.resources
         # расширение хранилища существа, которое предоставляет часть тела
-        self.extra_storage: Resources[int] = self.resources * self.extra_storage_coeff
-        self.extra_storage.iround()
+        self.extra_storage = self.composition_info.extra_storage
         self._remaining_resources: Resources[int] | None = None
 
         self._mass: float | None = None
-        self.volume = sum(resource.volume * amount for resource, amount in self.remaining_resources.items())
+        self.volume = self.composition_info.volume
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({sum(self.remaining_resources.values())}/{sum(self.resources.values())})"
 
+    @property
+    def sort_key(self) -> tuple[str, int]:
+        """Ключ для упорядочивания частей тела, не зависящий от адресов объектов."""
+
+        return self.gene.name, self.gene.number
+
     @property
     def remaining_resources(self) -> Resources[int]:
         """Ресурсы, находящиеся в части тела сейчас."""
 
         if self._remaining_resources is None:
-            self._remaining_resources = self.resources - self.damage
+            if self.damage.total() == 0:
+                self._remaining_resources = self.resources
+            else:
+                self._remaining_resources = self.resources - self.damage
         return self._remaining_resources
 
+    @property
+    def resources_ledger(self) -> ResourcesLedger | None:
+        """Учет ресурсов мира - изменения ресурсов учитываются, только пока существо находится в мире."""
+
+        if self.creature.alive:
+            return self.creature.world.resources_ledger
+        return None
+
+    @classmethod
+    @functools.lru_cache(maxsize = 4096)
+    def get_composition(cls, size_coeff: float) -> BodypartComposition:
+        """Возвращает общие для всех частей тела данного класса и размера неизменяемые характеристики."""
+
+        resources = Resources[int](
+            {RESOURCE_DICT[resource_name]: amount for resource_name, amount in cls.composition.items()}
+        )
+        resources *= size_coeff
+        resources.iround()
+        for resource_name in cls.composition:
+            if resources[RESOURCE_DICT[resource_name]] == 0:
+                resources[RESOURCE_DICT[resource_name]] = 1
+        extra_storage = resources * cls.extra_storage_coeff
+        extra_storage.iround()
+        volume = sum(resource.volume * amount for resource, amount in resources.items())
+        return BodypartComposition(resources.freeze(), extra_storage.freeze(), volume)
+
     # todo: переделать на обычный атрибут и вычислять заранее, так как это приведет к уменьшению вызовов функций
     @property
     def all_required(self) -> set["BodypartInterfaceClass"]:
@@ -174,7 +214,7 @@ class BodypartInterface(GetSubclassesMixin["BodypartInterface"], ApplyDescriptor
     def destroy(self) -> Resources[int]:
         """Уничтожает часть тела и все зависимые."""
 
-        return_resources = self.remaining_resources
+        return_resources = self.remaining_resources.copy()
         if not self.destroyed:
             if self in self.creature.damaged_bodyparts:
                 self.creature.damaged_bodyparts.remove(self)
@@ -187,6 +227,8 @@ class BodypartInterface(GetSubclassesMixin["BodypartInterface"], ApplyDescriptor
 
             self.reset_resources_cache()
             self.reset_physic_cache()
+            if (ledger := self.resources_ledger) is not None:
+                ledger.creatures -= return_resources
             # не переходить на self.all_dependent,
             # потому что части тела (например ResourcesStorage) могут переопределять self.destroy
             for dependent in self.dependent_bodyparts:
@@ -202,6 +244,8 @@ class BodypartInterface(GetSubclassesMixin["BodypartInterface"], ApplyDescriptor
     def make_damage(self, damaging_resources: Resources[int]) -> Resources[int]:
         if sum(damaging_resources.values()) > 0:
             self.damage += damaging_resources
+            if (ledger := self.resources_ledger) is not None:
+                ledger.creatures -= damaging_resources
             self.reset_resources_cache()
             self.reset_physic_cache()
             for resource, amount in self.damage.items():
@@ -225,15 +269,15 @@ class BodypartInterface(GetSubclassesMixin["BodypartInterface"], ApplyDescriptor
 
         return return_resources
 
-    # если возвращаемые ресурсы != 0, значит эти ресурсы не израсходованы при регенерации
+    # resources изменяются на месте - после вызова в них остаются только израсходованные при регенерации ресурсы
     def regenerate(self, resources: Resources[int]) -> Resources[int]:
         # поправка на урон части тела
-        regenerating_resources = Resources[int](
-            {resource: min(amount, self.damage[resource]) for resource, amount in resources.items()}
-        )
+        regenerating_resources = resources.iminimum(self.damage)
 
-        if sum(regenerating_resources.values()) > 0:
+        if regenerating_resources.total() > 0:
             self.damage -= regenerating_resources
+            if (ledger := self.resources_ledger) is not None:
+                ledger.creatures += regenerating_resources
             self.reset_resources_cache()
             self.reset_physic_cache()
 
@@ -253,12 +297,7 @@ class BodypartInterface(GetSubclassesMixin["BodypartInterface"], ApplyDescriptor
                     self.creature.damaged_bodyparts.remove(self)
                     self.creature.not_damaged_bodyparts.add(self)
 
-            return_resources = resources - regenerating_resources
-        # часть тела не получила необходимых для регенерации ресурсов
-        else:
-            return_resources = resources
-
-        return return_resources
+        return regenerating_resources
 
     def reset_physic_cache(self) -> None:
         self._mass = None
@@ -320,6 +359,8 @@ class StorageInterface(BodypartInterface):
     def destroy(self) -> Resources[int]:
         return_resources = super().destroy()
         return_resources += self.current
+        if (ledger := self.resources_ledger) is not None:
+            ledger.creatures -= self.current
         self.current = Resources[int]()
         return return_resources
 
@@ -350,24 +391,29 @@ class StorageInterface(BodypartInterface):
         if self._fullness is None:
             self._fullness = Resources[float]()
             for resource, capacity in self.capacity.items():
-                self._fullness[resource] = self.current[resource] / capacity
+                if capacity > 0:
+                    self._fullness[resource] = self.current[resource] / capacity
         return self._fullness
 
     @property
     def mean_fullness(self) -> float:
         if self._mean_fullness is None:
-            self._mean_fullness = statistics.mean(self.fullness.values())
+            # учитываются только ресурсы, для которых есть место в хранилище
+            self._mean_fullness = statistics.mean(
+                self.fullness[resource] for resource, capacity in self.capacity.items() if capacity > 0
+            )
         return self._mean_fullness
 
     def add_resources(self, resources: Resources[int]) -> None:
         self.reset_storage_cache()
+        ledger = self.resources_ledger
         for resource, amount in resources.items():
-            not_added_resources = Resources[int]()
             if self.capacity[resource] > 0:
                 self.current[resource] += amount
-            else:
-                not_added_resources[resource] += amount
-            if len(not_added_resources) > 0:
+                if ledger is not None:
+                    ledger.creatures[resource] += amount
+            elif amount != 0:
+                not_added_resources = Resources[int]({resource: amount})
                 raise AddToNonExistentStorageException(
                     f"{not_added_resources} can not be added to {self}.",
                     not_added_resources
@@ -375,15 +421,16 @@ class StorageInterface(BodypartInterface):
 
     def remove_resources(self, resources: Resources[int]) -> None:
         self.reset_storage_cache()
+        ledger = self.resources_ledger
         for resource, amount in resources.items():
-            not_removed_resources = Resources[int]()
             if self.capacity[resource] > 0:
                 self.current[resource] -= amount
+                if ledger is not None:
+                    ledger.creatures[resource] -= amount
                 if self.current[resource] < 0:
                     raise ValueError(f"{resource} is below zero ({self.current[resource]}) in storage.")
-            else:
-                not_removed_resources[resource] += amount
-            if len(not_removed_resources) > 0:
+            elif amount != 0:
+                not_removed_resources = Resources[int]({resource: amount})
                 raise RemoveFromNonExistentStorageException(
                     f"{not_removed_resources} can not be removed from {self}.",
                     not_removed_resources
@@ -420,8 +467,7 @@ class ResourceStorageInterface(BodypartInterface):
         # k - коэффициент растяжения - насколько больше пленка, чем сумма ее ресурсов
         k = 4
         # ресурсы части тела натянуты однослойной пленкой
-        resources_volume = sum(resource.volume * amount for resource, amount in self.resources.items())
-        area = k * resources_volume
+        area = k * self.composition_info.volume
         self.capacity = int(area / 6 * math.sqrt(area / math.pi))
         # увеличение объема, показывающее, что хранилище имеет место для ресурсов
         self.volume += self.capacity
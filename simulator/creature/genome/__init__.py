@@ -9,7 +9,7 @@ from evolution import settings
 from simulator.creature.genome.chromosome import Chromosome
 from simulator.creature.genome.chromosome.gene import BodypartGeneInterface, GENE_CLASSES, GeneInterface, \
     GeneInterfaceClass
-from simulator.world_resource import Resources
+from simulator.world_resource import ENERGY, Resources, to_fixed_point
 
 
 # https://adamj.eu/tech/2021/05/13/python-type-hints-how-to-fix-circular-imports/
@@ -29,12 +29,18 @@ class GenomeEffects:
         self.elasticity = 0.0
         self.metabolism = 0.0
         self.resources_loss_coeff = 0.0
+        # metabolism и resources_loss_coeff с фиксированной точкой
+        self.metabolism_fixed_point = 0
+        self.resources_loss_coeff_fixed_point = 0
         self.regeneration_amount = 0.0
         self.regeneration_amount_coeff: float | None = None
         # количество определенного ресурса, которое существо может потребить за тик
         self.consumption_amount = Resources[int]()
         # максимальная сумма всех ресурсов, которое существо может потребить за тик
         self.consumption_limit = 0
+        # потребление веществ за тик без энергии (энергия запрашивается отдельно при метаболизме)
+        self.material_consumption_amount: Resources[int] | None = None
+        self.material_consumption_sum = 0
         # {gene.name: {gene.number: gene}}
         self.bodyparts_genes: dict[str, dict[int, BodypartGeneInterface]] | None = None
         # {gene.required_bodypart_gene: {gene.required_gene_number: {gene}}}
@@ -50,6 +56,12 @@ class GenomeEffects:
     def prepare(self) -> None:
         self.prepare_color()
 
+        self.material_consumption_amount = self.consumption_amount.copy()
+        self.material_consumption_amount[ENERGY] = 0
+        self.material_consumption_sum = self.material_consumption_amount.total()
+        self.metabolism_fixed_point = to_fixed_point(self.metabolism)
+        self.resources_loss_coeff_fixed_point = to_fixed_point(self.resources_loss_coeff)
+
         # устанавливается влияние генов на длительность действий
         metabolism_gene_class = GENE_CLASSES["metabolism_gene"]
         resources_loss_coeff_gene_class = GENE_CLASSES["resources_loss_coeff_gene"]
@@ -118,7 +130,7 @@ class GenomeEffects:
             # ген только появился в геноме или необходимый уникальный ген был потерян при мутации генома
             # gene.name != "body_gene" - туловище не от чего не зависит
             if gene.required_gene_number is None and gene.name != "body_gene":
-                gene.required_gene_number = random.choice(
+                gene.required_gene_number = genome.random.choice(
                     list(self.bodyparts_genes[gene.required_bodypart_gene].keys())
                 )
 
@@ -141,7 +153,10 @@ genome_descriptor = ObjectDescriptionReader[GenomeDescriptor]().read_folder_to_l
 
 
 class Genome:
-    def __init__(self, chromosomes: list[Chromosome] | None, world_generation: bool):
+    def __init__(self, chromosomes: list[Chromosome] | None, world_generation: bool, rng: random.Random):
+        # генератор случайных чисел мира, которому принадлежит существо
+        # (хромосомы и гены обращаются к нему через геном - обратных ссылок у них нет)
+        self.random = rng
         self.base_mutation_chance = genome_descriptor.base_mutation_chance
         self.max_new_chromosomes = genome_descriptor.max_new_chromosomes
 
@@ -183,8 +198,8 @@ class Genome:
         return gene_name in self.gene_counter
 
     @classmethod
-    def get_first_genome(cls) -> Self:
-        return cls(None, True)
+    def get_first_genome(cls, rng: random.Random) -> Self:
+        return cls(None, True, rng)
 
     def contains_all(self, gene_names: list[str]) -> bool:
         for gene_name in gene_names:
@@ -203,10 +218,13 @@ class Genome:
     def mutate(self) -> None:
         # исчезновение хромосом
         if len(self.chromosomes) > 1:
-            amount = random.choices(range(len(self.chromosomes)), [1 / 10**x for x in range(len(self.chromosomes))])[0]
+            amount = self.random.choices(
+                range(len(self.chromosomes)), [1 / 10**x for x in range(len(self.chromosomes))]
+            )[0]
             weights = [chromosome.get_disappearance_chance(self) for chromosome in self.chromosomes]
             if sum(weights) > 0:
-                disappearing_chromosomes = set(random.choices(self.chromosomes, weights, k = amount))
+                # dict вместо set - порядок обхода не должен зависеть от адресов объектов
+                disappearing_chromosomes = dict.fromkeys(self.random.choices(self.chromosomes, weights, k = amount))
                 for chromosome in disappearing_chromosomes:
                     if chromosome.can_disappear(self):
                         self.gene_counter.subtract(chromosome.gene_counter)
@@ -214,9 +232,9 @@ class Genome:
                         self.mutation["removed"].add(chromosome)
 
         # добавляются новые хромосомы
-        mutate_number = random.randint(0, len(self.chromosomes))
+        mutate_number = self.random.randint(0, len(self.chromosomes))
         if mutate_number == len(self.chromosomes):
-            new_chromosomes_number = 1 + random.choices(
+            new_chromosomes_number = 1 + self.random.choices(
                 range(self.max_new_chromosomes), [1 / 10**x for x in range(self.max_new_chromosomes)]
             )[0]
             new_chromosomes = [Chromosome([]) for _ in range(new_chromosomes_number)]
@@ -224,9 +242,9 @@ class Genome:
             self.mutation["added"].update(new_chromosomes)
 
         # мутации хромосом
-        amount = random.choices(range(len(self.chromosomes)), [1 / 10**x for x in range(len(self.chromosomes))])[0]
+        amount = self.random.choices(range(len(self.chromosomes)), [1 / 10**x for x in range(len(self.chromosomes))])[0]
         weights = [chromosome.mutation_chance for chromosome in self.chromosomes]
-        chromosome_numbers = set(random.choices(range(len(self.chromosomes)), weights, k = amount))
+        chromosome_numbers = set(self.random.choices(range(len(self.chromosomes)), weights, k = amount))
         for number in chromosome_numbers:
             self.gene_counter.subtract(self.chromosomes[number].gene_counter)
             self.chromosomes[number].mutate(self)
@@ -273,11 +291,11 @@ class Genome:
         self.effects.prepare()
 
     @classmethod
-    def get_child_genome(cls, parents: list["Creature"]) -> "Genome":
+    def get_child_genome(cls, parents: list["Creature"], rng: random.Random) -> "Genome":
         # todo: переделать этот метод при введении системы полового размножения
         parent = parents[0]
-        child_genome = cls(copy.deepcopy(parent.genome.chromosomes), False)
-        if random.random() <= child_genome.mutation_chance:
+        child_genome = cls(copy.deepcopy(parent.genome.chromosomes), False, rng)
+        if rng.random() <= child_genome.mutation_chance:
             child_genome.mutate()
         return child_genome
 
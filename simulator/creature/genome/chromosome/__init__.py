@@ -1,5 +1,4 @@
 import dataclasses
-import random
 from collections import Counter
 from typing import Self, TYPE_CHECKING, Type
 
@@ -93,10 +92,13 @@ class Chromosome:
     def mutate(self, genome: "Genome") -> None:
         # исчезновение генов
         if len(self.genes) > 0:
-            amount = random.choices(range(len(self.genes)), [1 / 10**x for x in range(len(self.genes))])[0]
+            amount = genome.random.choices(range(len(self.genes)), [1 / 10**x for x in range(len(self.genes))])[0]
             weights = [gene.get_disappearance_chance(genome) for gene in self.genes]
             if sum(weights) > 0:
-                disappearing_genes: set[GeneInterfaceClass] = set(random.choices(self.genes, weights, k = amount))
+                # dict вместо set - порядок обхода не должен зависеть от адресов объектов
+                disappearing_genes: dict[GeneInterfaceClass, None] = dict.fromkeys(
+                    genome.random.choices(self.genes, weights, k = amount)
+                )
                 for gene in disappearing_genes:
                     if gene.can_disappear(genome):
                         self.gene_counter[gene.name] -= 1
@@ -104,29 +106,29 @@ class Chromosome:
                         genome.mutation["mutated"]["removed"].add(gene)
 
         # добавляются новые гены
-        mutate_number = random.randint(0, len(self.genes))
+        mutate_number = genome.random.randint(0, len(self.genes))
         if mutate_number == len(self.genes):
             available_gene_classes = GeneInterface.get_available_gene_classes(genome)
             if len(available_gene_classes) > 0:
                 weights = [gene.appearance_chance for gene in available_gene_classes]
-                new_genes_number = 1 + random.choices(
+                new_genes_number = 1 + genome.random.choices(
                     range(self.max_new_genes), [1 / 5**x for x in range(self.max_new_genes)]
                 )[0]
 
-                new_gene_classes = random.choices(available_gene_classes, weights, k = new_genes_number)
+                new_gene_classes = genome.random.choices(available_gene_classes, weights, k = new_genes_number)
                 self.gene_counter.update(x.name for x in new_gene_classes)
-                new_genes = GeneInterface.construct_genes(False, new_gene_classes)
+                new_genes = GeneInterface.construct_genes(False, new_gene_classes, genome.random)
                 self.genes.extend(new_genes)
                 genome.mutation["mutated"]["added"].update(new_genes)
 
         # мутации генов
         if len(self.genes) > 0:
-            amount = random.choices(range(len(self.genes)), [1 / 10**x for x in range(len(self.genes))])[0]
+            amount = genome.random.choices(range(len(self.genes)), [1 / 10**x for x in range(len(self.genes))])[0]
             weights = [gene.mutation_chance for gene in self.genes]
             # если хромосома пустая или содержит лишь гены, которые не могут мутировать,
             # то мутировать нечему (секция добавления генов в начале метода)
             if sum(weights) > 0:
-                genes: set[GeneInterface] = set(random.choices(self.genes, weights, k = amount))
+                genes: dict[GeneInterface, None] = dict.fromkeys(genome.random.choices(self.genes, weights, k = amount))
                 for gene in genes:
                     gene.mutate(genome)
                 genome.mutation["mutated"]["mutated"].update(genes)
@@ -50,8 +50,9 @@ class GeneInterface(GetSubclassesMixin["GeneInterface"], ApplyDescriptorMixin, a
     # интерфейсы не должны использовать конструктор
     # не использовать обратные ссылки (gene -> chromosome -> genome),
     # они сильно усложняют код и вызывают проблемы при копировании (а значит и при создании потомков) хромосом и генов
-    def __init__(self, first: bool) -> None:
+    def __init__(self, first: bool, rng: random.Random | None = None) -> None:
         # first - принадлежит ли ген первому существу
+        # rng - генератор мира, нужен только генам, появившимся при мутации
         self.first = first
         # влияет ли ген на существо
         self.active: bool | None = None
@@ -69,8 +70,13 @@ class GeneInterface(GetSubclassesMixin["GeneInterface"], ApplyDescriptorMixin, a
         return f"{self.__class__.__name__}({active})"
 
     @classmethod
-    def construct_genes(cls, first: bool, gene_classes: list[Type["GeneInterfaceClass"]]) -> list["GeneInterfaceClass"]:
-        return [x(first) for x in gene_classes]
+    def construct_genes(
+            cls,
+            first: bool,
+            gene_classes: list[Type["GeneInterfaceClass"]],
+            rng: random.Random | None = None
+    ) -> list["GeneInterfaceClass"]:
+        return [x(first, rng) for x in gene_classes]
 
     # результат должен вычисляться каждый раз, так как геном мутирует при наследовании
     def get_disappearance_chance(self, genome: "Genome") -> float:
@@ -148,11 +154,11 @@ class StepGeneMixin(Generic[ST]):
     # максимальное значение влияния всех таких генов
     common_max_limit: ST
 
-    def make_step(self, sign: Literal['+', '-'] = None) -> ST:
+    def make_step(self, rng: random.Random, sign: Literal['+', '-'] = None) -> ST:
         negative_step = self.negative_step if hasattr(self, "negative_step") else self.step
         positive_step = self.positive_step if hasattr(self, "positive_step") else self.step
         if sign is None:
-            step = [-negative_step, positive_step][random.randint(0, 1)]
+            step = [-negative_step, positive_step][rng.randint(0, 1)]
         elif sign == '+':
             step = positive_step
         elif sign == '-':
@@ -173,8 +179,8 @@ class BodypartGeneInterface(StepGeneMixin, GeneInterface):
     size_coeff: float
     required_bodypart_gene: str
 
-    def __init__(self, first: bool) -> None:
-        super().__init__(first)
+    def __init__(self, first: bool, rng: random.Random | None = None) -> None:
+        super().__init__(first, rng)
         # номер гена части тела (bodypart_gene.number) к которой присоединена эта часть тела
         self.required_gene_number: int | None = None
         # порядковый номер гена этого типа/класса в геноме
@@ -208,9 +214,9 @@ class BodypartGeneInterface(StepGeneMixin, GeneInterface):
                 dependent_genes[self.required_bodypart_gene][self.required_gene_number].remove(self)
 
     def mutate(self, genome: "Genome") -> None:
-        new_size_coeff = self.size_coeff + self.make_step()
+        new_size_coeff = self.size_coeff + self.make_step(genome.random)
         if new_size_coeff < self.min_limit:
-            self.size_coeff += self.make_step("+")
+            self.size_coeff += self.make_step(genome.random, "+")
         else:
             self.size_coeff = new_size_coeff
 
@@ -224,7 +230,7 @@ class BodypartGeneInterface(StepGeneMixin, GeneInterface):
 
         if cls.uniq and len(genes[cls.name]) > 1:
             uniq_genes = list(genes[cls.name].values())
-            selected_gene = uniq_genes[random.randint(0, len(uniq_genes) - 1)]
+            selected_gene = uniq_genes[genome.random.randint(0, len(uniq_genes) - 1)]
             genes[cls.name] = {selected_gene.number: selected_gene}
 
             for not_used in uniq_genes:
@@ -253,18 +259,18 @@ class ResourceConsumptionGeneInterface(StepGeneMixin, GeneInterface):
     default_consumption: int
     resource: str
 
-    def __init__(self, first: bool) -> None:
-        super().__init__(first)
+    def __init__(self, first: bool, rng: random.Random | None = None) -> None:
+        super().__init__(first, rng)
         if self.first:
             self.consumption = self.default_consumption
         else:
-            self.consumption = self.make_step()
+            self.consumption = self.make_step(rng)
 
     def __repr__(self) -> str:
         return f"{super().__repr__()}: {self.consumption}"
 
     def mutate(self, genome: "Genome") -> None:
-        self.consumption += self.make_step()
+        self.consumption += self.make_step(genome.random)
 
     def apply(self, genome: "Genome") -> None:
         genome.effects.consumption_amount[RESOURCE_DICT[self.resource]] += self.consumption
@@ -282,23 +288,23 @@ class NumberGeneInterface(StepGeneMixin[ST], GeneInterface):
     attribute_default: ST
     attribute_name: str
 
-    def __init__(self, first: bool) -> None:
-        super().__init__(first)
+    def __init__(self, first: bool, rng: random.Random | None = None) -> None:
+        super().__init__(first, rng)
         if self.first:
             self.attribute_value = self.attribute_default
         else:
-            self.attribute_value = self.make_step()
+            self.attribute_value = self.make_step(rng)
 
     def __repr__(self) -> str:
         return f"{super().__repr__()}: {self.attribute_value}"
 
     def mutate(self, genome: "Genome") -> None:
-        step = self.make_step()
+        step = self.make_step(genome.random)
         new_value = self.attribute_value + step
         if hasattr(self, "min_limit") and new_value < self.min_limit:
-            self.attribute_value += self.make_step("+")
+            self.attribute_value += self.make_step(genome.random, "+")
         elif hasattr(self, "max_limit") and new_value > self.max_limit:
-            self.attribute_value += self.make_step("-")
+            self.attribute_value += self.make_step(genome.random, "-")
         else:
             self.attribute_value = new_value
 
@@ -333,7 +339,7 @@ class ColorGeneInterface(StepGeneMixin[int], GeneInterface):
         return f"{super().__repr__()}: {self.pigment_amount}"
 
     def mutate(self, genome: "Genome"):
-        self.pigment_amount += self.make_step()
+        self.pigment_amount += self.make_step(genome.random)
         if self.pigment_amount < 0:
             self.pigment_amount = 0
 
@@ -357,7 +363,7 @@ class ActionWeightCoeffGeneInterface(StepGeneMixin[int], GeneInterface):
         return f"{super().__repr__()}: {self.weight_coeff}"
 
     def mutate(self, genome: "Genome") -> None:
-        self.weight_coeff += self.make_step()
+        self.weight_coeff += self.make_step(genome.random)
 
     def apply(self, genome: "Genome") -> None:
         genome.effects.action_weights[self.action] += self.weight_coeff
@@ -488,21 +488,11 @@ class Window(arcade.Window):
         self.ui_manager.add_tabs(self.tab_container)
 
     def count_resources(self) -> None:
-        if self.map_resources_tab or self.world_resources_tab:
-            self.map_resources = Resources[int]()
-            # чтобы порядок ресурсов не менялся
-            self.map_resources.fill_all(0)
-            self.map_resources += Resources[int].sum(x.resources for x in self.world.all_tiles)
-
-        if self.creature_resources_tab or self.world_resources_tab:
-            self.creature_resources = Resources[int]()
-            # чтобы порядок ресурсов не менялся
-            self.creature_resources.fill_all(0)
-            self.creature_resources += Resources[int].sum(x.remaining_resources for x in self.world.creatures) + \
-                                       Resources[int].sum(x.storage.current for x in self.world.creatures)
-
-        if self.world_resources_tab:
-            self.world_resources = self.map_resources + self.creature_resources
+        # суммы берутся из учета ресурсов мира, поэтому не пересчитываются
+        ledger = self.world.resources_ledger
+        self.map_resources = ledger.map.copy()
+        self.creature_resources = ledger.creatures.copy()
+        self.world_resources = ledger.world
 
     def count_statistics(self, start: float, finish: float) -> None:
         self.timings["on_update"].append(finish - start)
@@ -553,19 +543,11 @@ class Window(arcade.Window):
             self.count_statistics(start, finish)
 
     def update_resources_overlay(self) -> None:
-        resources = {}
-        maximum = 0
-        minimum = 1024**16
-        for tile in self.world.map_tiles:
-            resources_sum = sum(tile.resources.values())
-            resources[tile] = resources_sum
-            if resources_sum > maximum:
-                maximum = resources_sum
-            if resources_sum < minimum:
-                minimum = resources_sum
-        for tile in self.world.map_tiles:
-            # gradient = (1 - (resources[tile] - minimum) / (maximum - minimum)) * 255
-            gradient = (1 - resources[tile] / maximum) * 255
+        resources = self.world.tile_store.resources[[x.id for x in self.world.map_tiles]].sum(axis = 1)
+        maximum = resources.max()
+        # gradient = (1 - (resources - minimum) / (maximum - minimum)) * 255
+        gradients = ((1 - resources / maximum) * 255).tolist()
+        for tile, gradient in zip(self.world.map_tiles, gradients):
             tile.color = (gradient, gradient, gradient, 255)
 
     def set_tps(self, tps: int) -> None:
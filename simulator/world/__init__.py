@@ -2,10 +2,12 @@ import dataclasses
 import math
 import random
 from collections import defaultdict
-from typing import Any, Sequence, Type
+from typing import Any, Iterable, Sequence, Type
 
 import arcade
 import imagesize
+import numpy
+import pymunk
 from PIL import Image
 
 from core import models
@@ -13,15 +15,22 @@ from core.hitbox import CustomHitBoxAlgorithm
 from core.mixin import WorldObjectMixin
 from core.physic.engine import PhysicsEngine
 from core.physic.world import WorldCharacteristics
-from core.service import EvolutionSpriteList, ObjectDescriptionReader
+from core.service import CounterRandom, EvolutionSpriteList, ObjectDescriptionReader
 from evolution import settings
 from simulator.creature import Creature
 from simulator.creature.action import ActionInterface
-from simulator.creature.bodypart import AddToNonExistentStorageException
-from simulator.world_resource import ENERGY, RESOURCE_LIST, Resources
+from simulator.world.scheduler import TimingWheel
+from simulator.world.tick_pipeline import TickPipeline
+from simulator.world.tile_store import TileStore
+from simulator.world_resource import RESOURCE_LIST, Resources, ResourcesBatch, ResourcesLedger, VectorResources
 
 
 Position = tuple[float, float]
+# осевые координаты шестиугольной плитки
+# https://www.redblobgames.com/grids/hexagons/#coordinates-axial
+AxialCoordinates = tuple[int, int]
+# смещения осевых координат соседних плиток
+AXIAL_DIRECTIONS: tuple[AxialCoordinates, ...] = ((1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1))
 CREATURE_START_RESOURCES = Resources({resource: 100 for resource in RESOURCE_LIST})
 
 
@@ -41,9 +50,29 @@ class WorldDescriptor:
     border_thickness: int
     resource_density: float
     tile_radius: int
-    seed: int
+    # None - зерно выбирается случайно при создании мира
+    seed: int | None
+    # periodic - все плитки обмениваются ресурсами раз в tile_share_resources_period тиков
+    # staggered - плитки делятся на tile_share_resources_period групп и каждый тик обменивается одна группа
+    tile_share_resources_policy: str
+    # explicit - за период ресурсы перемещаются на долю tile_share_resources_coeff от разницы
+    # implicit - неявный метод, устойчивый при любом tile_share_resources_coeff (только с политикой periodic)
+    #  tile_share_resources_coeff - доля за тик, и за период решается один шаг длиной tile_share_resources_period
+    #  тиков, поэтому изменение периода почти не меняет перемещение ресурсов
+    tile_share_resources_integrator: str
     tile_share_resources_period: int
     tile_share_resources_coeff: float
+    # плитка перестает участвовать в перемещении ресурсов, когда перемещения по ее ребрам не больше этого значения
+    tile_share_resources_threshold: int
+    # размер областей плиток в осевых координатах (0 - мир не делится на области)
+    # области без существ, ресурсы плиток которых уравновешены, засыпают и не участвуют в перемещении ресурсов
+    # перемещения через границу спящей области, не превышающие tile_chunk_wake_threshold, не выполняются,
+    # поэтому результат перемещения ресурсов отличается от мира без областей
+    tile_chunk_size: int
+    # спящая область просыпается, когда перемещение через ее границу превышает это значение
+    tile_chunk_wake_threshold: int
+    # максимальное количество пропущенных периодов перемещения ресурсов, навёрстываемых при пробуждении области
+    tile_chunk_catch_up_limit: int
 
 
 # todo: добавить выбор настроек мира
@@ -53,14 +82,32 @@ world_descriptor: WorldDescriptor = ObjectDescriptionReader[WorldDescriptor]().r
 )[0]
 
 
+@dataclasses.dataclass
+class TileChanges:
+    """Итог массового изменения плиток карты."""
+
+    removed_tiles: list["WorldTile"]
+    added_tiles: list["WorldTile"]
+    # координаты, по которым нет плиток
+    missed_coordinates: list[AxialCoordinates]
+    # изменение ресурсов на карте
+    resources: Resources[int]
+
+
 class World(WorldObjectMixin):
     db_model = models.World
     db_instance: db_model
+    TILE_SHARE_RESOURCES_POLICIES = ("periodic", "staggered")
+    TILE_SHARE_RESOURCES_INTEGRATORS = ("explicit", "implicit")
 
     # width - минимальное значение ширины экрана - 120
     def __init__(self, window_center: Position) -> None:
-        self.seed = world_descriptor.seed
-        random.seed(self.seed)
+        # зерно задается один раз при создании мира - без зерна в описании каждый запуск будет другим,
+        # но его можно повторить, указав это зерно в описании мира
+        if world_descriptor.seed is None:
+            self.seed = random.SystemRandom().getrandbits(64)
+        else:
+            self.seed = world_descriptor.seed
 
         self._id = None
         self.age = 0
@@ -69,9 +116,27 @@ class World(WorldObjectMixin):
         self.center = window_center
         self.tile_radius = world_descriptor.tile_radius
         # количество тиков между перемещениями ресурсов
+        self.tile_share_resources_policy = world_descriptor.tile_share_resources_policy
+        if self.tile_share_resources_policy not in self.TILE_SHARE_RESOURCES_POLICIES:
+            raise ValueError(f"Unknown tile share resources policy: {self.tile_share_resources_policy}.")
+        self.tile_share_resources_integrator = world_descriptor.tile_share_resources_integrator
+        if self.tile_share_resources_integrator not in self.TILE_SHARE_RESOURCES_INTEGRATORS:
+            raise ValueError(f"Unknown tile share resources integrator: {self.tile_share_resources_integrator}.")
+        if self.tile_share_resources_integrator == "implicit" and self.tile_share_resources_policy != "periodic":
+            raise ValueError("Implicit tile share resources integrator can be used only with periodic policy.")
         self.tile_share_resources_period = world_descriptor.tile_share_resources_period
         # коэффициент разницы ресурсов, которые будут перемещены
         self.tile_share_resources_coeff = world_descriptor.tile_share_resources_coeff
+        self.tile_share_resources_threshold = world_descriptor.tile_share_resources_threshold
+        # параметр неявного метода за период (None - ресурсы перемещаются явным методом)
+        # явное перемещение с коэффициентом coeff соответствует tau = 2 * coeff, а период длится period тиков
+        if self.tile_share_resources_integrator == "implicit":
+            self.tile_share_resources_tau = 2 * self.tile_share_resources_coeff * self.tile_share_resources_period
+        else:
+            self.tile_share_resources_tau = None
+        self.tile_chunk_size = world_descriptor.tile_chunk_size
+        # суммы ресурсов на карте и у существ, обновляемые при изменениях
+        self.resources_ledger = ResourcesLedger()
 
         self.characteristics = WorldCharacteristics(
             world_descriptor.viscosity,
@@ -80,24 +145,50 @@ class World(WorldObjectMixin):
             world_descriptor.resource_density
         )
         self.physics_engine = PhysicsEngine(damping = 1 - self.characteristics.viscosity)
-        self.position_to_tile_cache: dict[tuple[int, int], WorldTile] = {}
+        # количество колец плиток вокруг центральной, не считая границы
+        self.tiles_in_radius = self.radius // self.tile_radius or 1
+        # плитки по осевым координатам, сдвинутым на tiles_grid_radius, чтобы индексы были неотрицательными
+        # index = (q + tiles_grid_radius) * tiles_grid_size + (r + tiles_grid_radius)
+        self.tiles_grid_radius = self.tiles_in_radius + self.characteristics.border_thickness - 1
+        self.tiles_grid_size = self.tiles_grid_radius * 2 + 1
+        self.tiles_grid: list[WorldTile | None] = [None] * self.tiles_grid_size**2
+        # области плиток - квадраты сетки tiles_grid со стороной tile_chunk_size
+        if self.tile_chunk_size > 0:
+            self.tile_chunks_in_row = math.ceil(self.tiles_grid_size / self.tile_chunk_size)
+        else:
+            self.tile_chunks_in_row = 0
+        # данные плиток - плиток не может быть больше, чем шестиугольников в сетке
+        self.tile_store = TileStore(
+            3 * self.tiles_grid_radius * (self.tiles_grid_radius + 1) + 1,
+            self.resources_ledger,
+            self.tile_chunks_in_row**2,
+            world_descriptor.tile_chunk_wake_threshold,
+            world_descriptor.tile_chunk_catch_up_limit
+        )
 
         # copy.copy(self.creatures) может работать не правильно, так как SpriteList использует внутренний список
         # {creature.object_id: creature}
         self.creatures = EvolutionSpriteList[Creature]()
-        self.processing_creatures: defaultdict[int, set[Creature]] = defaultdict(set)
-        self.active_creatures: dict[int, Creature] | None = None
+        # существа по тикам окончания их действий
+        self.scheduler = TimingWheel[Creature]()
+        self.active_creatures: list[Creature] | None = None
+        self.tick_pipeline = TickPipeline()
 
+        # плитки ищутся по осевым координатам (tiles_grid), поэтому пространственный хэш спискам плиток не нужен
         # список плиток мира
-        self.map_tiles = arcade.SpriteList[WorldTile](True)
+        self.map_tiles = EvolutionSpriteList[WorldTile]()
         # список плиток границы мира
-        self.border_tiles = arcade.SpriteList[BorderWorldTile](True)
+        self.border_tiles = EvolutionSpriteList[BorderWorldTile]()
         # список всех плиток
-        self.all_tiles = arcade.SpriteList[WorldTile | BorderWorldTile](True)
-        self.map_tile_borders = arcade.shape_list.ShapeElementList()
+        self.all_tiles = EvolutionSpriteList[WorldTile | BorderWorldTile]()
+        # границы мира - одно статическое тело из отрезков по сторонам плиток границы, касающимся плиток карты
+        # перестраивается перед шагом физики, если плитки изменились
+        self.border_body = pymunk.Body(body_type = pymunk.Body.STATIC)
+        self.border_shapes: list[pymunk.Segment] = []
+        self.border_changed = False
+        # границы плиток карты строятся при первом обращении к map_tile_borders (включении отображения сетки)
+        self.built_map_tile_borders: arcade.shape_list.ShapeElementList | None = None
         self.cut()
-        for tile in self.map_tiles:
-            self.map_tile_borders.append(tile.border)
 
         # все объекты, которые должны сохраняться в БД, должны складываться сюда для ускорения записи в БД
         self.object_to_save_to_db: defaultdict[
@@ -105,6 +196,8 @@ class World(WorldObjectMixin):
             list[models.EvolutionModel]
         ] = defaultdict(list)
 
+        self.register_tick_phases()
+
     @property
     def id(self) -> int:
         if self._id is None:
@@ -146,6 +239,14 @@ class World(WorldObjectMixin):
             creature.stop()
         self.save_objects_to_db()
 
+    def get_random(self, *key: int | str) -> CounterRandom:
+        """
+        Возвращает счетчиковый генератор для ключа (существо, тик, назначение).
+        У каждого мира свои потоки, и числа в них не зависят от порядка обработки существ.
+        """
+
+        return CounterRandom(self.seed, *key)
+
     def spawn_start_creature(self, position: Position) -> None:
         creature = Creature(self, None, True)
 
@@ -154,14 +255,14 @@ class World(WorldObjectMixin):
         tile_resources_differance += creature.resources + CREATURE_START_RESOURCES
 
         try:
-            tile_resources = self.position_to_tile(position).resources
-            for resource, amount in tile_resources.items():
+            tile = self.position_to_tile(position)
+            for resource, amount in self.tile_store.get_available_resources(tile.id).items():
                 if amount < tile_resources_differance[resource]:
                     print("Can not spawn creature due to resources lack.")
                     break
             else:
                 # ресурсы забираются безотлагательно
-                tile_resources -= tile_resources_differance
+                self.tile_store.take_resources(tile.id, tile_resources_differance)
                 creature.position = position
                 creature.start()
                 creature.storage.add_resources(CREATURE_START_RESOURCES)
@@ -172,108 +273,277 @@ class World(WorldObjectMixin):
         """Добавляет существо в мир."""
 
         self.creatures.append(creature)
+        self.place_creature(creature, self.position_to_tile(creature.position))
 
     # если существо необходимо убить, то это нужно сделать отдельно (creature.kill)
     def remove_creature(self, creature: Creature) -> None:
         """Убирает существо из мира."""
 
         self.creatures.remove(creature)
-        if creature.action.stop_tick > self.age:
-            self.processing_creatures[creature.action.stop_tick].remove(creature)
+        # плитка существа остается известной ему, чтобы оно могло вернуть на нее ресурсы
+        self.tile_store.remove_creature(creature.tile.id, creature)
+        self.scheduler.cancel(creature)
         self.physics_engine.remove_sprite(creature)
 
     def on_update(self) -> None:
         try:
-            self.active_creatures = self.processing_creatures[self.age]
+            # порядок обработки существ не должен зависеть от адресов объектов (порядка обхода множества),
+            # иначе запросы ресурсов, физика и список существ расходятся между запусками с одним зерном
+            self.active_creatures = sorted(self.scheduler.pop_due(self.age), key = lambda x: x.random_key)
+            self.tick_pipeline.run(self.age)
+            self.active_creatures = None
+            self.age += 1
+        except Exception as error:
+            error.world = self
+            raise error
 
-            for creature in self.creatures:
-                creature.update_position_history()
+    def register_tick_phases(self) -> None:
+        """Задает порядок фаз тика - их периодичность задается описаниями фаз."""
+
+        self.tick_pipeline.register("position_history", self.update_position_history)
+        # существа, извлеченные из планировщика, должны выполнить и выбрать действие в тот же тик,
+        # а их запросы ресурсов - обработаться до следующих запросов
+        self.tick_pipeline.register("perform", self.perform_creatures, True)
+        self.tick_pipeline.register("tile_update", self.tile_store.on_update, True)
+        # периодичность перемещения ресурсов задается описанием мира (tile_share_resources_period)
+        self.tick_pipeline.register("share_tile_resources", self.share_tile_resources, True)
+        self.tick_pipeline.register("next_action", self.select_next_actions, True)
+        self.tick_pipeline.register("physics", self.step_physics)
+        self.tick_pipeline.register("creature_tiles", self.update_creature_tiles)
+        self.tick_pipeline.register("resources_conservation_check", self.resources_ledger.check_conservation)
+        self.tick_pipeline.register("resources_ledger_check", self.check_resources_ledger)
+        self.tick_pipeline.register("save_to_db", self.save_objects_to_db)
+
+    def update_position_history(self) -> None:
+        for creature in self.creatures:
+            creature.update_position_history()
 
-            for creature in self.active_creatures:
-                creature.perform()
+    def perform_creatures(self) -> None:
+        """Существа, заканчивающие действия в этот тик, выполняют их."""
 
-            for tile in self.all_tiles:
-                tile.on_update()
+        for creature in self.active_creatures:
+            creature.perform()
 
-            if self.age % self.tile_share_resources_period == 0:
-                self.share_tile_resources()
+    def select_next_actions(self) -> None:
+        for creature in self.active_creatures:
+            if creature.alive:
+                creature.action = ActionInterface.get_next_action(creature)
 
-            for creature in self.active_creatures:
-                if creature.alive:
-                    creature.action = ActionInterface.get_next_action(creature)
+    def step_physics(self) -> None:
+        if self.border_changed:
+            self.build_border_body()
+        # не передавать delta_time, так как физические расчеты должны быть привязаны не ко времени, а к тикам
+        self.physics_engine.step()
 
-            del self.processing_creatures[self.age]
-            self.active_creatures = None
-            # не передавать delta_time, так как физические расчеты должны быть привязаны не ко времени, а к тикам
-            self.physics_engine.step()
+    def place_creature(self, creature: Creature, tile: "WorldTile") -> None:
+        """Переносит существо на плитку в индексе существ плиток."""
 
-            if self.age % 100 == 0:
-                self.save_objects_to_db()
-            self.age += 1
-        except Exception as error:
-            error.world = self
-            raise error
+        if creature.tile is not None:
+            self.tile_store.remove_creature(creature.tile.id, creature)
+        creature.tile = tile
+        self.tile_store.add_creature(tile.id, creature)
 
-    def position_to_tile(self, position: Position) -> "WorldTile":
-        point = (int(position[0]), int(position[1]))
-        if point not in self.position_to_tile_cache:
-            try:
-                self.position_to_tile_cache[point] = arcade.get_sprites_at_point(point, self.all_tiles)[0]
-            except IndexError as error:
-                raise PositionToTileError(position) from error
-        return self.position_to_tile_cache[point]
+    def get_tile_creatures(self, tile: "WorldTile") -> set[Creature]:
+        """Существа, находящиеся на плитке."""
 
-    def share_tile_resources(self) -> None:
-        sharing_resources: list[tuple[WorldTile, WorldTile, Resources[int]]] = []
-        for tile in self.all_tiles:
-            for neighbor in tile.neighbors:
-                difference = (tile.resources - neighbor.resources) * self.tile_share_resources_coeff
-                difference.iround()
-                sharing_resources.append((neighbor, tile, difference))
+        return self.tile_store.get_creatures(tile.id)
 
-        for neighbor, tile, difference in sharing_resources:
-            tile.resources -= difference
-            neighbor.resources += difference
+    def update_creature_tiles(self) -> None:
+        """Обновляет индекс существ плиток для существ, пересекших границу своей плитки."""
 
-    # мир делится на шестиугольники
-    # https://www.redblobgames.com/grids/hexagons/
-    # todo: переименовать метод
-    def cut(self) -> None:
-        width = math.sqrt(3) * self.tile_radius
-        height = 2 * self.tile_radius
-        offsets = (
-            (width / 2, height * 3 / 4),
-            (width, 0),
-            (width / 2, -height * 3 / 4),
-            (-width / 2, -height * 3 / 4),
-            (-width, 0),
-            (-width / 2, height * 3 / 4)
-        )
-        tiles_in_radius = self.radius // self.tile_radius or 1
+        # точки внутри вписанной окружности плитки принадлежат ей, и их осевые координаты не пересчитываются
+        inner_radius_square = (math.sqrt(3) / 2 * self.tile_radius)**2
+        for creature in self.creatures:
+            tile = creature.tile
+            if (creature.center_x - tile.center_x)**2 + (creature.center_y - tile.center_y)**2 > inner_radius_square:
+                new_tile = self.position_to_tile(creature.position)
+                if new_tile is not tile:
+                    self.place_creature(creature, new_tile)
+
+    def build_border_body(self) -> None:
+        """Перестраивает статическое тело границ мира."""
+
+        space = self.physics_engine.space
+        if self.border_body.space is None:
+            space.add(self.border_body)
+        if len(self.border_shapes) > 0:
+            space.remove(*self.border_shapes)
+
+        # стороны плиток границы, за которыми находятся плитки карты
+        border_ids = numpy.array([tile.id for tile in self.border_tiles], numpy.intp)
+        is_border = numpy.zeros(self.tile_store.capacity, numpy.bool_)
+        is_border[border_ids] = True
+        neighbor_ids = self.tile_store.neighbors[border_ids]
+        rows, directions = numpy.nonzero((neighbor_ids >= 0) & ~is_border[neighbor_ids])
+
+        self.border_shapes = []
+        for row, direction in zip(rows.tolist(), directions.tolist()):
+            tile = self.tile_store.tiles[border_ids[row]]
+            # сторона, обращенная в направлении AXIAL_DIRECTIONS[direction], лежит между вершинами
+            # под углами -60 * direction -+ 30 градусов
+            vertices = []
+            for angle in (-60 * direction - 30, -60 * direction + 30):
+                vertices.append((
+                    tile.center_x + self.tile_radius * math.cos(math.radians(angle)),
+                    tile.center_y + self.tile_radius * math.sin(math.radians(angle))
+                ))
+            shape = pymunk.Segment(self.border_body, vertices[0], vertices[1], WorldTile.overlap_distance)
+            shape.friction = self.characteristics.border_friction
+            self.border_shapes.append(shape)
+        if len(self.border_shapes) > 0:
+            space.add(*self.border_shapes)
+        self.border_changed = False
+
+    def check_resources_ledger(self) -> None:
+        """Сверяет учет ресурсов с полным пересчетом."""
+
+        # ресурсы берутся напрямую из хранилища, чтобы не отмечать плитки измененными
+        map_resources = VectorResources.from_array(self.tile_store.resources.sum(axis = 0))
+        creature_resources = ResourcesBatch.from_iterable(
+            resources
+            for creature in self.creatures for resources in (creature.remaining_resources, creature.storage.current)
+        ).sum()
+        self.resources_ledger.check(map_resources, creature_resources)
+
+    def position_to_axial(self, position: Position) -> AxialCoordinates:
+        """Переводит координаты точки в осевые координаты плитки, в которой она находится."""
+
+        # https://www.redblobgames.com/grids/hexagons/#pixel-to-hex
+        x = (position[0] - self.center[0]) / self.tile_radius
+        y = (position[1] - self.center[1]) / self.tile_radius
+        q = math.sqrt(3) / 3 * x - y / 3
+        r = 2 / 3 * y
+        s = -q - r
+
+        # https://www.redblobgames.com/grids/hexagons/#rounding
+        rounded_q = round(q)
+        rounded_r = round(r)
+        rounded_s = round(s)
+        q_difference = abs(rounded_q - q)
+        r_difference = abs(rounded_r - r)
+        s_difference = abs(rounded_s - s)
+        if q_difference > r_difference and q_difference > s_difference:
+            rounded_q = -rounded_r - rounded_s
+        elif r_difference > s_difference:
+            rounded_r = -rounded_q - rounded_s
+        return rounded_q, rounded_r
+
+    def axial_to_index(self, coordinates: AxialCoordinates) -> int | None:
+        """Возвращает индекс плитки в tiles_grid или None, если координаты вне сетки."""
+
+        q = coordinates[0] + self.tiles_grid_radius
+        r = coordinates[1] + self.tiles_grid_radius
+        if 0 <= q < self.tiles_grid_size and 0 <= r < self.tiles_grid_size:
+            return q * self.tiles_grid_size + r
+        return None
+
+    def axial_to_chunk(self, coordinates: AxialCoordinates) -> int:
+        """Возвращает номер области плиток или -1, если мир не делится на области или координаты вне сетки."""
+
+        q = coordinates[0] + self.tiles_grid_radius
+        r = coordinates[1] + self.tiles_grid_radius
+        if self.tile_chunks_in_row > 0 and 0 <= q < self.tiles_grid_size and 0 <= r < self.tiles_grid_size:
+            return q // self.tile_chunk_size * self.tile_chunks_in_row + r // self.tile_chunk_size
+        return -1
+
+    def axial_to_tile(self, coordinates: AxialCoordinates) -> "WorldTile | None":
+        if (index := self.axial_to_index(coordinates)) is not None:
+            return self.tiles_grid[index]
+        return None
 
-        tile_center = list(self.center)
-        SimpleWorldTile(tile_center, self).register(True)
+    def position_to_tile(self, position: Position) -> "WorldTile":
+        tile = self.axial_to_tile(self.position_to_axial(position))
+        if tile is None:
+            raise PositionToTileError(position)
+        return tile
 
-        for edge_size in range(1, tiles_in_radius + self.characteristics.border_thickness):
-            if edge_size < tiles_in_radius:
-                tile_class = SimpleWorldTile
+    # ресурсы перемещаются между плитками, но их сумма на карте не меняется, поэтому учет не обновляется
+    def share_tile_resources(self) -> None:
+        if self.tile_chunks_in_row > 0 and self.age % self.tile_share_resources_period == 0:
+            self.update_tile_chunks()
+
+        if self.tile_share_resources_policy == "staggered":
+            self.tile_store.share_resources(
+                self.tile_share_resources_coeff,
+                self.tile_share_resources_threshold,
+                self.age % self.tile_share_resources_period,
+                self.tile_share_resources_period
+            )
+        elif self.age % self.tile_share_resources_period == 0:
+            if self.tile_share_resources_integrator == "implicit":
+                self.tile_store.share_resources_implicit(
+                    self.tile_share_resources_tau,
+                    self.tile_share_resources_threshold
+                )
             else:
-                tile_class = BorderWorldTile
+                self.tile_store.share_resources(self.tile_share_resources_coeff, self.tile_share_resources_threshold)
+
+    def update_tile_chunks(self) -> None:
+        """Усыпляет и будит области плиток перед началом периода перемещения ресурсов."""
+
+        occupied_chunks = {
+            self.axial_to_chunk(creature.tile.axial_coordinates) for creature in self.creatures
+        }
+        occupied_chunks.discard(-1)
+        self.tile_store.update_chunks(
+            numpy.fromiter(occupied_chunks, numpy.intp, len(occupied_chunks)),
+            self.tile_share_resources_coeff,
+            self.tile_share_resources_tau
+        )
 
-            tile_center[0] -= width
+    @property
+    def map_tile_borders(self) -> arcade.shape_list.ShapeElementList:
+        if self.built_map_tile_borders is None:
+            self.built_map_tile_borders = arcade.shape_list.ShapeElementList()
+            for tile in self.map_tiles:
+                self.built_map_tile_borders.append(tile.border)
+        return self.built_map_tile_borders
 
-            for offset_x, offset_y in offsets:
-                for _ in range(edge_size):
-                    tile_center[0] += offset_x
-                    tile_center[1] += offset_y
-                    tile_class(tile_center, self).register(True)
+    def axial_to_position(self, coordinates: AxialCoordinates) -> Position:
+        """Переводит осевые координаты плитки в координаты ее центра."""
 
-        for tile in self.all_tiles:
-            for offset_x, offset_y in offsets:
-                try:
-                    tile.neighbors.add(self.position_to_tile((tile.center_x + offset_x, tile.center_y + offset_y)))
-                except PositionToTileError:
-                    pass
+        # https://www.redblobgames.com/grids/hexagons/#hex-to-pixel
+        x = self.tile_radius * math.sqrt(3) * (coordinates[0] + coordinates[1] / 2)
+        y = self.tile_radius * 3 / 2 * coordinates[1]
+        return self.center[0] + x, self.center[1] + y
+
+    # мир делится на шестиугольники
+    # https://www.redblobgames.com/grids/hexagons/
+    # todo: переименовать метод
+    def cut(self) -> None:
+        """Создает плитки всех колец сетки, а затем регистрирует и связывает их вместе."""
+
+        simple_tiles: list[SimpleWorldTile] = []
+        border_tiles: list[BorderWorldTile] = []
+        radius = self.tiles_grid_radius
+        for q in range(-radius, radius + 1):
+            for r in range(max(-radius, -q - radius), min(radius, -q + radius) + 1):
+                center = self.axial_to_position((q, r))
+                # номер кольца - расстояние до центральной плитки
+                if max(abs(q), abs(r), abs(q + r)) < self.tiles_in_radius:
+                    simple_tiles.append(SimpleWorldTile(center, self))
+                else:
+                    border_tiles.append(BorderWorldTile(center, self))
+
+        SimpleWorldTile.register_batch(self, simple_tiles, True)
+        BorderWorldTile.register_batch(self, border_tiles, True)
+        self.link_tiles()
+
+    def link_tiles(self) -> None:
+        """Связывает все плитки сетки с соседними."""
+
+        size = self.tiles_grid_size
+        grid_ids = numpy.array([-1 if tile is None else tile.id for tile in self.tiles_grid], numpy.int32)
+        indexes = numpy.flatnonzero(grid_ids >= 0)
+        tile_ids = grid_ids[indexes]
+        q, r = numpy.divmod(indexes, size)
+        for direction, (direction_q, direction_r) in enumerate(AXIAL_DIRECTIONS):
+            neighbor_q = q + direction_q
+            neighbor_r = r + direction_r
+            inside = (neighbor_q >= 0) & (neighbor_q < size) & (neighbor_r >= 0) & (neighbor_r < size)
+            neighbor_ids = numpy.full(len(tile_ids), -1, numpy.int32)
+            neighbor_ids[inside] = grid_ids[neighbor_q[inside] * size + neighbor_r[inside]]
+            self.tile_store.set_neighbors(tile_ids, direction, neighbor_ids)
 
     # для правильного физического взаимодействия объекты должны быть непрерывными
     @staticmethod
@@ -303,13 +573,53 @@ class World(WorldObjectMixin):
 
         return sprite
 
+    def change_tiles(self, tile_class: type["WorldTile"], coordinates: Iterable[AxialCoordinates]) -> TileChanges:
+        """
+        Заменяет плитки с переданными осевыми координатами плитками tile_class.
+        Все изменения списков плиток, физики и связей соседей выполняются вместе.
+        """
+
+        changes = TileChanges([], [], [], Resources())
+        changes.resources.fill_all(0)
+        indexes = set()
+        for tile_coordinates in coordinates:
+            index = self.axial_to_index(tile_coordinates)
+            if index is None or self.tiles_grid[index] is None:
+                changes.missed_coordinates.append(tile_coordinates)
+            elif index not in indexes:
+                indexes.add(index)
+                changes.removed_tiles.append(self.tiles_grid[index])
+
+        removed_by_class: defaultdict[type[WorldTile], list[WorldTile]] = defaultdict(list)
+        for tile in changes.removed_tiles:
+            removed_by_class[type(tile)].append(tile)
+        changes.resources -= VectorResources.from_array(
+            self.tile_store.resources[[tile.id for tile in changes.removed_tiles]].sum(axis = 0)
+        )
+        tiles_creatures = [self.get_tile_creatures(tile) for tile in changes.removed_tiles]
+        # места старых плиток в TileStore освобождаются до создания новых
+        for removed_class, removed_tiles in removed_by_class.items():
+            removed_class.unregister_batch(self, removed_tiles, False)
+
+        changes.added_tiles.extend(tile_class(tile.position, self) for tile in changes.removed_tiles)
+        tile_class.register_batch(self, changes.added_tiles, False)
+        for tile, tile_creatures in zip(changes.added_tiles, tiles_creatures):
+            for creature in tile_creatures:
+                creature.tile = None
+                self.place_creature(creature, tile)
+        changes.resources += VectorResources.from_array(
+            self.tile_store.resources[[tile.id for tile in changes.added_tiles]].sum(axis = 0)
+        )
+        return changes
+
     def change_tiles_by_matrix(
             self,
             tile_class: type["WorldTile"],
             reference_tile: "WorldTile",
             matrix: tuple[tuple[Any, ...], ...]
-    ) -> None:
+    ) -> TileChanges:
         reference_position = reference_tile.position
+        coordinates = []
 
         for line_index, line in enumerate(matrix):
             for tile_index, tile in enumerate(line):
@@ -317,13 +627,9 @@ class World(WorldObjectMixin):
                     x_offset = (tile_index + line_index % 2 / 2) * tile_class.default_width
                     y_offset = (line_index * 3 / 4) * tile_class.default_height
                     position = (reference_position[0] + x_offset, reference_position[1] + y_offset)
+                    coordinates.append(self.position_to_axial(position))
 
-                    old_tile = self.position_to_tile(position)
-                    position = old_tile.position
-                    old_tile.unregister(True)
-
-                    tile = tile_class(position, self)
-                    tile.register(True)
+        return self.change_tiles(tile_class, coordinates)
 
 
 class WorldTile(arcade.Sprite):
@@ -344,99 +650,136 @@ class WorldTile(arcade.Sprite):
         super().__init__(self.default_texture, center_x = center[0], center_y = center[1])
         self.width = self.default_width
         self.height = self.default_height
-        self.border_points = (
-            (self.center_x - self.width / 2, self.center_y - self.height / 4),
-            (self.center_x - self.width / 2, self.center_y + self.height / 4),
-            (self.center_x, self.center_y + self.height / 2),
-            (self.center_x + self.width / 2, self.center_y + self.height / 4),
-            (self.center_x + self.width / 2, self.center_y - self.height / 4),
-            (self.center_x, self.center_y - self.height / 2)
-        )
-        self.border = arcade.shape_list.create_line_loop(
-            self.border_points,
-            self.default_border_color,
-            self.overlap_distance
-        )
+        # граница строится только при первом обращении
+        self.built_border: arcade.shape_list.Shape | None = None
 
-        self.default_resource_amount = int(
-            self.radius**2 * 3 * math.sqrt(3) / 2 * self.world.characteristics.resource_density
+        self.axial_coordinates = self.world.position_to_axial(self.position)
+        # данные плитки находятся в TileStore, плитка только отображает их
+        self.id = self.world.tile_store.add(
+            self,
+            int(self.radius**2 * 3 * math.sqrt(3) / 2 * self.world.characteristics.resource_density),
+            self.world.axial_to_chunk(self.axial_coordinates)
         )
-        self.resources = Resources[int]()
-        self.resources.fill_all(self.default_resource_amount)
-        self.remove_resources_requests: dict[Creature, Resources[int]] = {}
-        self.add_resources_requests: dict[Creature, Resources[int]] = {}
-
-        self.neighbors: set[WorldTile] = set()
         self.color = self.default_color
 
     def __repr__(self) -> str:
         return f"{self.center_x, self.center_y}"
 
-    def on_update(self, delta_time: float = 1 / 60) -> None:
-        # выдача ресурсов существам
-        requested_resources = Resources[int].sum(self.remove_resources_requests.values())
-        not_enough = set(
-            resource for resource, requested_amount in requested_resources.items()
-            if requested_amount > self.resources[resource]
-        )
-        for creature, creature_request in self.remove_resources_requests.items():
-            removed_resources = Resources[int](
-                {
-                    resource: self.resources[resource] // requested_resources[resource] * amount
-                    if resource in not_enough else amount for resource, amount in creature_request.items()
-                }
+    @property
+    def border(self) -> arcade.shape_list.Shape:
+        if self.built_border is None:
+            border_points = (
+                (self.center_x - self.width / 2, self.center_y - self.height / 4),
+                (self.center_x - self.width / 2, self.center_y + self.height / 4),
+                (self.center_x, self.center_y + self.height / 2),
+                (self.center_x + self.width / 2, self.center_y + self.height / 4),
+                (self.center_x + self.width / 2, self.center_y - self.height / 4),
+                (self.center_x, self.center_y - self.height / 2)
             )
-            try:
-                creature.storage.add_resources(removed_resources)
-            except AddToNonExistentStorageException as exception:
-                removed_resources -= exception.resources
-            self.resources -= removed_resources
+            self.built_border = arcade.shape_list.create_line_loop(
+                border_points,
+                self.default_border_color,
+                self.overlap_distance
+            )
+        return self.built_border
+
+    @property
+    def resources(self) -> VectorResources[int]:
+        """Ресурсы плитки - изменения контейнера отражаются в TileStore."""
 
-        # получение ресурсов от существ
-        self.resources += Resources[int].sum(self.add_resources_requests.values())
+        return self.world.tile_store.get_resources(self.id)
 
-        self.resources[ENERGY] = self.default_resource_amount
-        self.remove_resources_requests = {}
-        self.add_resources_requests = {}
+    @resources.setter
+    def resources(self, resources: Resources[int]) -> None:
+        # присваивание происходит при операторах вида tile.resources += other
+        self.world.tile_store.get_resources(self.id).assign(resources)
 
-        for resource, amount in self.resources.items():
-            if amount < 0:
-                raise ValueError(f"Resource amount can not be below zero, but there is {self.resources}.")
+    @property
+    def default_resource_amount(self) -> int:
+        return self.world.tile_store.default_amounts.item(self.id)
+
+    @property
+    def neighbors(self) -> list["WorldTile"]:
+        tiles = self.world.tile_store.tiles
+        return [tiles[neighbor_id] for neighbor_id in self.world.tile_store.neighbors[self.id].tolist()
+                if neighbor_id >= 0]
+
+    def link_neighbors(self) -> None:
+        """Связывает плитку с соседними плитками сетки."""
+
+        for direction, (direction_q, direction_r) in enumerate(AXIAL_DIRECTIONS):
+            neighbor = self.world.axial_to_tile(
+                (self.axial_coordinates[0] + direction_q, self.axial_coordinates[1] + direction_r)
+            )
+            if neighbor is not None:
+                self.world.tile_store.link(self.id, direction, neighbor.id)
 
     def register(self, map_creation: bool) -> None:
-        self.world.all_tiles.append(self)
+        self.register_batch(self.world, [self], map_creation)
 
     def unregister(self, map_creation: bool) -> None:
-        self.remove_from_sprite_lists()
+        self.unregister_batch(self.world, [self], map_creation)
+
+    @classmethod
+    def register_batch(cls, world: World, tiles: Sequence["WorldTile"], map_creation: bool) -> None:
+        """Регистрирует плитки. При создании карты соседи связываются отдельно (World.link_tiles)."""
+
+        world.all_tiles.extend(tiles)
+        world.border_changed = True
+        for tile in tiles:
+            world.tiles_grid[world.axial_to_index(tile.axial_coordinates)] = tile
+        if not map_creation:
+            # связи двусторонние, поэтому достаточно связать новые плитки
+            for tile in tiles:
+                tile.link_neighbors()
+        resources = VectorResources.from_array(world.tile_store.resources[[tile.id for tile in tiles]].sum(axis = 0))
+        world.resources_ledger.map += resources
+        world.resources_ledger.injected += resources
+
+    @classmethod
+    def unregister_batch(cls, world: World, tiles: Sequence["WorldTile"], map_creation: bool) -> None:
+        resources = VectorResources.from_array(world.tile_store.resources[[tile.id for tile in tiles]].sum(axis = 0))
+        world.resources_ledger.map -= resources
+        world.resources_ledger.injected -= resources
+        world.all_tiles.remove_many(tiles)
+        world.border_changed = True
+        for tile in tiles:
+            index = world.axial_to_index(tile.axial_coordinates)
+            if world.tiles_grid[index] is tile:
+                world.tiles_grid[index] = None
+            world.tile_store.remove(tile.id)
 
 
 class SimpleWorldTile(WorldTile):
     default_color = (255, 255, 255, 255)
 
-    def register(self, map_creation: bool) -> None:
-        super().register(map_creation)
-        self.world.map_tiles.append(self)
-        if not map_creation:
-            self.world.map_tile_borders.append(self.border)
+    @classmethod
+    def register_batch(cls, world: World, tiles: Sequence["SimpleWorldTile"], map_creation: bool) -> None:
+        super().register_batch(world, tiles, map_creation)
+        world.map_tiles.extend(tiles)
+        # непостроенные границы будут построены уже с данными плитками
+        if not map_creation and world.built_map_tile_borders is not None:
+            for tile in tiles:
+                world.built_map_tile_borders.append(tile.border)
 
-    def unregister(self, map_creation: bool) -> None:
-        super().unregister(map_creation)
-        if not map_creation:
-            self.world.map_tile_borders.remove(self.border)
+    @classmethod
+    def unregister_batch(cls, world: World, tiles: Sequence["SimpleWorldTile"], map_creation: bool) -> None:
+        super().unregister_batch(world, tiles, map_creation)
+        world.map_tiles.remove_many(tiles)
+        if not map_creation and world.built_map_tile_borders is not None:
+            for tile in tiles:
+                world.built_map_tile_borders.remove(tile.border)
 
 
 class BorderWorldTile(WorldTile):
     default_color = (200, 200, 200, 255)
 
-    def register(self, map_creation: bool) -> None:
-        super().register(map_creation)
-        self.world.border_tiles.append(self)
-        self.world.physics_engine.add_sprite(
-            self,
-            friction = self.world.characteristics.border_friction,
-            body_type = arcade.PymunkPhysicsEngine.STATIC
-        )
+    @classmethod
+    def register_batch(cls, world: World, tiles: Sequence["BorderWorldTile"], map_creation: bool) -> None:
+        super().register_batch(world, tiles, map_creation)
+        world.border_tiles.extend(tiles)
 
-    def unregister(self, map_creation: bool) -> None:
-        super().unregister(map_creation)
-        self.world.physics_engine.remove_sprite(self)
+    @classmethod
+    def unregister_batch(cls, world: World, tiles: Sequence["BorderWorldTile"], map_creation: bool) -> None:
+        super().unregister_batch(world, tiles, map_creation)
+        world.border_tiles.remove_many(tiles)
@@ -0,0 +1,76 @@
+from collections import defaultdict
+from typing import Generic, Hashable, TypeVar
+
+
+ItemType = TypeVar("ItemType", bound = Hashable)
+
+
+class TimingWheel(Generic[ItemType]):
+    """
+    Планировщик на колесе времени.
+    Элементы, запланированные не дальше size тиков вперед, лежат в ячейках колеса, остальные - в словаре по тикам.
+    Планирование, отмена и извлечение элементов тика выполняются за O(1).
+    Тики должны извлекаться по возрастанию, пропускать можно только тики без элементов.
+    """
+
+    def __init__(self, size: int = 1024, tick: int = 0) -> None:
+        self.size = size
+        # тик, следующий за последним извлеченным
+        self.tick = tick
+        self.slots: list[set[ItemType]] = [set() for _ in range(size)]
+        self.overflow: defaultdict[int, set[ItemType]] = defaultdict(set)
+        self.item_ticks: dict[ItemType, int] = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(tick: {self.tick}, items: {len(self)})"
+
+    def __len__(self) -> int:
+        return len(self.item_ticks)
+
+    def __contains__(self, item: ItemType) -> bool:
+        return item in self.item_ticks
+
+    def schedule(self, item: ItemType, tick: int) -> None:
+        """Планирует элемент на тик - ранее запланированный элемент переносится."""
+
+        if tick < self.tick:
+            raise ValueError(f"Tick {tick} has already passed, current tick is {self.tick}.")
+
+        self.cancel(item)
+        self.item_ticks[item] = tick
+        if tick - self.tick < self.size:
+            self.slots[tick % self.size].add(item)
+        else:
+            self.overflow[tick].add(item)
+
+    def cancel(self, item: ItemType) -> bool:
+        """Отменяет элемент. Возвращает False, если элемент не был запланирован."""
+
+        if (tick := self.item_ticks.pop(item, None)) is None:
+            return False
+
+        slot = self.slots[tick % self.size]
+        if item in slot:
+            slot.remove(item)
+        else:
+            tick_items = self.overflow[tick]
+            tick_items.remove(item)
+            if len(tick_items) == 0:
+                del self.overflow[tick]
+        return True
+
+    def pop_due(self, tick: int) -> set[ItemType]:
+        """Извлекает элементы, запланированные на тик."""
+
+        if tick < self.tick:
+            raise ValueError(f"Tick {tick} has already passed, current tick is {self.tick}.")
+
+        slot_index = tick % self.size
+        items = self.slots[slot_index]
+        self.slots[slot_index] = set()
+        if tick in self.overflow:
+            items |= self.overflow.pop(tick)
+        for item in items:
+            del self.item_ticks[item]
+        self.tick = tick + 1
+        return items
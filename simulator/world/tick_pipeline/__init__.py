@@ -0,0 +1,94 @@
+import dataclasses
+import time
+from typing import Callable
+
+from core.service import ObjectDescriptionReader
+from evolution import settings
+
+
+@dataclasses.dataclass
+class TickPhaseDescriptor:
+    name: str
+    # фаза выполняется в тики, для которых tick % period == offset
+    period: int
+    offset: int
+    enabled: bool
+
+
+tick_phase_descriptors = ObjectDescriptionReader[TickPhaseDescriptor]().read_folder_to_dict(
+    settings.TICK_PHASE_DESCRIPTIONS_PATH,
+    TickPhaseDescriptor
+)
+
+
+class TickPhase:
+    """Фаза тика - функция, выполняемая с собственной периодичностью."""
+
+    def __init__(self, descriptor: TickPhaseDescriptor, function: Callable[[], None]) -> None:
+        if descriptor.period < 1:
+            raise ValueError(f"Tick phase {descriptor.name} period must be positive, but it is {descriptor.period}.")
+
+        self.name = descriptor.name
+        self.period = descriptor.period
+        self.offset = descriptor.offset % descriptor.period
+        self.enabled = descriptor.enabled
+        self.function = function
+
+        # затраты на фазу
+        self.calls = 0
+        self.duration = 0.0
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name}: calls: {self.calls}, duration: {self.duration:.3f} s)"
+
+    def is_due(self, tick: int) -> bool:
+        return self.enabled and tick % self.period == self.offset
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        self.function()
+        self.duration += time.perf_counter() - start
+        self.calls += 1
+
+
+class TickPipeline:
+    """
+    Последовательность фаз тика.
+    Периодичность фаз задается описаниями (settings.TICK_PHASE_DESCRIPTIONS_PATH),
+    поэтому точность симуляции можно менять без изменения мира.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, TickPhase] = {}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self.phases)})"
+
+    def register(self, name: str, function: Callable[[], None], every_tick: bool = False) -> TickPhase:
+        """
+        Добавляет фазу в конец последовательности.
+        every_tick - фаза не может пропускать тики, поэтому ее описание должно задавать включенную фазу с периодом 1.
+        """
+
+        if name in self.phases:
+            raise ValueError(f"Tick phase {name} is already registered.")
+
+        descriptor = tick_phase_descriptors[name]
+        if every_tick and (descriptor.period != 1 or not descriptor.enabled):
+            raise ValueError(f"Tick phase {name} must be enabled and run every tick (period 1).")
+
+        phase = TickPhase(descriptor, function)
+        self.phases[name] = phase
+        return phase
+
+    def run(self, tick: int) -> None:
+        """Выполняет фазы, которые должны выполняться в этот тик."""
+
+        for phase in self.phases.values():
+            if phase.is_due(tick):
+                phase.run()
+
+    def get_costs(self) -> dict[str, tuple[int, float]]:
+        """Количество выполнений и суммарное время выполнения (в секундах) каждой фазы."""
+
+        return {name: (phase.calls, phase.duration) for name, phase in self.phases.items()}
@@ -0,0 +1,516 @@
+from typing import TYPE_CHECKING
+
+import numpy
+
+from simulator.world_resource import ENERGY, RESOURCES_AMOUNT, Resources, ResourcesBatch, ResourcesLedger, \
+    VectorResources
+
+
+if TYPE_CHECKING:
+    from simulator.creature import Creature
+    from simulator.world import WorldTile
+
+
+# максимальное количество соседей у шестиугольной плитки
+NEIGHBORS_AMOUNT = 6
+
+
+class TileStore:
+    """
+    Хранилище данных плиток мира в непрерывных массивах, индексируемых id плитки.
+    Спрайты плиток (WorldTile) только отображают эти данные.
+    """
+
+    def __init__(
+            self,
+            capacity: int,
+            ledger: ResourcesLedger,
+            chunks_amount: int = 0,
+            chunk_wake_threshold: int = 0,
+            chunk_catch_up_limit: int = 0
+    ) -> None:
+        self.capacity = capacity
+        self.ledger = ledger
+        # плитки по id (None - id свободен)
+        self.tiles: list["WorldTile | None"] = [None] * capacity
+        # освободившиеся id переиспользуются
+        self.free_ids: list[int] = []
+        self.size = 0
+
+        # ресурсы плиток
+        self.resources = numpy.zeros((capacity, RESOURCES_AMOUNT), numpy.int64)
+        # количество ресурсов, которое находится на плитке при создании, и количество энергии, доступное за тик
+        # энергия не хранится в resources - она вычисляется по этим значениям при выдаче (energy_field)
+        self.default_amounts = numpy.zeros(capacity, numpy.int64)
+        # id соседних плиток по направлениям AXIAL_DIRECTIONS (-1 - соседа нет)
+        self.neighbors = numpy.full((capacity, NEIGHBORS_AMOUNT), -1, numpy.int32)
+        # плитки, ресурсы которых могли измениться с последнего перемещения ресурсов между плитками
+        # ребра, не касающиеся таких плиток, находятся в равновесии и не обрабатываются
+        self.dirty = numpy.zeros(capacity, numpy.bool_)
+        # ребра, обрабатываемые в текущем периоде перемещения ресурсов, упорядоченные по группам,
+        # и границы групп в них (None - период не начат или прерван изменением связей)
+        self.sharing_edges: tuple[numpy.ndarray, numpy.ndarray] | None = None
+        self.sharing_bounds: numpy.ndarray | None = None
+        # плитки, которые нужно обновить на следующем тике (обработать запросы и возвращенные ресурсы)
+        self.active_ids: set[int] = set()
+
+        # области плиток (-1 - плитка не принадлежит области)
+        self.chunks_amount = chunks_amount
+        self.chunk_wake_threshold = chunk_wake_threshold
+        self.chunk_catch_up_limit = chunk_catch_up_limit
+        self.tile_chunks = numpy.full(capacity, -1, numpy.int32)
+        # номер периода перемещения ресурсов, с которого область спит (-1 - область не спит)
+        self.chunks_asleep_since = numpy.full(chunks_amount, -1, numpy.int64)
+        # плитки спящих областей - ребра, касающиеся их, не обрабатываются
+        self.asleep = numpy.zeros(capacity, numpy.bool_)
+        self.sharing_periods = 0
+
+        # существа, находящиеся на плитках, по id плиток (поддерживается миром - World.place_creature)
+        # на большинстве плиток существ нет, поэтому множества заводятся только для занятых плиток
+        self.creatures: dict[int, set["Creature"]] = {}
+
+        # запросы существ на получение ресурсов с плиток (контейнеры запросов принадлежат существам)
+        self.remove_requests_tiles: list[int] = []
+        self.remove_requests_creatures: list["Creature"] = []
+        self.remove_requests_resources: list[Resources[int]] = []
+        # ресурсы, возвращаемые существами на плитки
+        self.returned_resources = numpy.zeros((capacity, RESOURCES_AMOUNT), numpy.int64)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.size}/{self.capacity})"
+
+    def add(self, tile: "WorldTile", default_amount: int, chunk_id: int = -1) -> int:
+        """Выделяет плитке место в хранилище и возвращает ее id."""
+
+        if len(self.free_ids) > 0:
+            tile_id = self.free_ids.pop()
+        else:
+            tile_id = self.size
+            if tile_id >= self.capacity:
+                raise ValueError(f"{self} is full.")
+        self.size = max(self.size, tile_id + 1)
+
+        self.tiles[tile_id] = tile
+        self.default_amounts[tile_id] = default_amount
+        self.resources[tile_id] = default_amount
+        self.resources[tile_id, ENERGY] = 0
+        self.neighbors[tile_id] = -1
+        self.dirty[tile_id] = True
+        self.active_ids.add(tile_id)
+        self.tile_chunks[tile_id] = chunk_id
+        # измененная плитка разбудит область в начале следующего периода
+        self.asleep[tile_id] = chunk_id >= 0 and self.chunks_asleep_since[chunk_id] >= 0
+        return tile_id
+
+    def remove(self, tile_id: int) -> None:
+        """Освобождает место плитки в хранилище."""
+
+        self.unlink(tile_id)
+        self.tiles[tile_id] = None
+        self.default_amounts[tile_id] = 0
+        self.resources[tile_id] = 0
+        self.returned_resources[tile_id] = 0
+        self.creatures.pop(tile_id, None)
+        self.dirty[tile_id] = False
+        self.active_ids.discard(tile_id)
+        self.tile_chunks[tile_id] = -1
+        self.asleep[tile_id] = False
+        self.reset_sharing()
+        self.free_ids.append(tile_id)
+
+    def add_creature(self, tile_id: int, creature: "Creature") -> None:
+        if tile_id in self.creatures:
+            self.creatures[tile_id].add(creature)
+        else:
+            self.creatures[tile_id] = {creature}
+
+    def remove_creature(self, tile_id: int, creature: "Creature") -> None:
+        if (tile_creatures := self.creatures.get(tile_id)) is not None:
+            tile_creatures.discard(creature)
+            if len(tile_creatures) == 0:
+                del self.creatures[tile_id]
+
+    def get_creatures(self, tile_id: int) -> set["Creature"]:
+        return self.creatures.get(tile_id, set())
+
+    def link(self, tile_id: int, direction: int, neighbor_id: int) -> None:
+        """Связывает плитку с соседней, находящейся в направлении direction."""
+
+        self.neighbors[tile_id, direction] = neighbor_id
+        self.neighbors[neighbor_id, (direction + NEIGHBORS_AMOUNT // 2) % NEIGHBORS_AMOUNT] = tile_id
+        self.dirty[tile_id] = True
+        self.dirty[neighbor_id] = True
+        self.reset_sharing()
+
+    def set_neighbors(self, tile_ids: numpy.ndarray, direction: int, neighbor_ids: numpy.ndarray) -> None:
+        """Задает соседей плиток в направлении direction - обратные связи не задаются."""
+
+        self.neighbors[tile_ids, direction] = neighbor_ids
+        self.dirty[tile_ids] = True
+        self.reset_sharing()
+
+    def unlink(self, tile_id: int) -> None:
+        """Разрывает связи плитки со всеми соседними."""
+
+        for direction, neighbor_id in enumerate(self.neighbors[tile_id].tolist()):
+            if neighbor_id >= 0:
+                self.neighbors[neighbor_id, (direction + NEIGHBORS_AMOUNT // 2) % NEIGHBORS_AMOUNT] = -1
+        self.neighbors[tile_id] = -1
+
+    def get_edges(self, dirty_ids: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Пара массивов (id плиток, id их соседей) - неориентированные ребра, касающиеся переданных плиток."""
+
+        rows, directions = numpy.nonzero(self.neighbors[dirty_ids] >= 0)
+        tile_ids = dirty_ids[rows]
+        neighbor_ids = self.neighbors[tile_ids, directions]
+        # ребро принадлежит плитке, от которой сосед находится в первой половине направлений,
+        # потому что противоположные направления отличаются на NEIGHBORS_AMOUNT // 2
+        half = NEIGHBORS_AMOUNT // 2
+        backward = directions >= half
+        owner_ids = numpy.where(backward, neighbor_ids, tile_ids)
+        # ребро, соединяющее две измененные плитки, встречается дважды
+        edge_keys = numpy.unique(owner_ids * half + directions % half)
+        owner_ids = edge_keys // half
+        return owner_ids, self.neighbors[owner_ids, edge_keys % half].astype(numpy.intp)
+
+    def get_awake_edges(self, tile_ids: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Ребра, касающиеся переданных плиток, кроме ребер, касающихся спящих плиток."""
+
+        tile_ids, neighbor_ids = self.get_edges(tile_ids)
+        awake = ~(self.asleep[tile_ids] | self.asleep[neighbor_ids])
+        return tile_ids[awake], neighbor_ids[awake]
+
+    def get_flow(self, tile_ids: numpy.ndarray, neighbor_ids: numpy.ndarray, coeff: float) -> numpy.ndarray:
+        """Перемещение ресурсов по ребрам от плиток к соседям."""
+
+        # перемещение по ребру в обе стороны округляется симметрично,
+        # поэтому суммарный поток - удвоенная округленная доля разницы
+        flow = numpy.rint((self.resources[tile_ids] - self.resources[neighbor_ids]) * coeff).astype(numpy.int64)
+        flow *= 2
+        return flow
+
+    def move_resources(self, tile_ids: numpy.ndarray, neighbor_ids: numpy.ndarray, flow: numpy.ndarray) -> None:
+        """Перемещает ресурсы по ребрам - сумма ресурсов на карте не меняется."""
+
+        numpy.subtract.at(self.resources, tile_ids, flow)
+        numpy.add.at(self.resources, neighbor_ids, flow)
+        changed = flow.any(axis = 1)
+        self.active_ids.update(tile_ids[changed].tolist())
+        self.active_ids.update(neighbor_ids[changed].tolist())
+
+    def update_chunks(self, occupied_chunks: numpy.ndarray, coeff: float, tau: float | None = None) -> None:
+        """
+        Усыпляет области без существ и измененных плиток и будит области, в которых есть существа
+        или измененные плитки, или перемещение через границу которых превышает chunk_wake_threshold.
+        Вызывается между периодами перемещения ресурсов.
+        tau - параметр неявного метода за период (None - ресурсы перемещаются явным методом с coeff).
+        """
+
+        dirty_ids = numpy.flatnonzero(self.dirty[:self.size])
+        awake_chunks = numpy.zeros(self.chunks_amount, numpy.bool_)
+        awake_chunks[occupied_chunks] = True
+        dirty_chunks = self.tile_chunks[dirty_ids]
+        awake_chunks[dirty_chunks[dirty_chunks >= 0]] = True
+
+        # ребра между измененными плитками и спящими плитками
+        tile_ids, neighbor_ids = self.get_edges(dirty_ids)
+        boundary = self.asleep[tile_ids] ^ self.asleep[neighbor_ids]
+        tile_ids = tile_ids[boundary]
+        neighbor_ids = neighbor_ids[boundary]
+        if tau is None:
+            flow = self.get_flow(tile_ids, neighbor_ids, coeff)
+        else:
+            # перемещение неявным методом между двумя плитками за период
+            flow = (self.resources[tile_ids] - self.resources[neighbor_ids]) * (tau / (1 + 2 * tau))
+        waking = numpy.abs(flow).max(axis = 1, initial = 0) > self.chunk_wake_threshold
+        asleep_ids = numpy.where(self.asleep[tile_ids], tile_ids, neighbor_ids)[waking]
+        awake_chunks[self.tile_chunks[asleep_ids]] = True
+
+        asleep_chunks = self.chunks_asleep_since >= 0
+        self.chunks_asleep_since[~asleep_chunks & ~awake_chunks] = self.sharing_periods
+        for chunk_id in numpy.flatnonzero(asleep_chunks & awake_chunks).tolist():
+            self.wake_chunk(chunk_id, coeff, tau)
+        tile_chunks = self.tile_chunks[:self.size]
+        self.asleep[:self.size] = (tile_chunks >= 0) & (self.chunks_asleep_since[tile_chunks] >= 0)
+
+    def wake_chunk(self, chunk_id: int, coeff: float, tau: float | None = None) -> None:
+        """
+        Будит область - перемещения ресурсов, пропущенные за время сна, выполняются сразу.
+        Перемещения навёрстываются тем же методом, которым ресурсы перемещаются в периодах (см. update_chunks).
+        """
+
+        missed_periods = self.sharing_periods - self.chunks_asleep_since[chunk_id]
+        self.chunks_asleep_since[chunk_id] = -1
+        tile_ids = numpy.flatnonzero(self.tile_chunks[:self.size] == chunk_id)
+        self.asleep[tile_ids] = False
+
+        # внутри спящей области ресурсы уравновешены, поэтому навёрстываются в основном перемещения через границу
+        edge_tile_ids, edge_neighbor_ids = self.get_awake_edges(tile_ids)
+        catch_up_periods = min(missed_periods, self.chunk_catch_up_limit)
+        if tau is None:
+            for _ in range(catch_up_periods):
+                flow = self.get_flow(edge_tile_ids, edge_neighbor_ids, coeff)
+                if not flow.any():
+                    break
+                self.move_resources(edge_tile_ids, edge_neighbor_ids, flow)
+        elif catch_up_periods > 0:
+            # неявный метод устойчив при любом шаге, поэтому пропущенные периоды навёрстываются одним решением
+            self.diffuse_implicit(edge_tile_ids, edge_neighbor_ids, tau * catch_up_periods)
+
+        self.dirty[tile_ids] = True
+
+    def start_sharing(self, groups_amount: int) -> None:
+        """Начинает период перемещения ресурсов - делит ребра, касающиеся измененных плиток, на группы."""
+
+        self.sharing_periods += 1
+        dirty_ids = numpy.flatnonzero(self.dirty[:self.size])
+        self.dirty[dirty_ids] = False
+        tile_ids, neighbor_ids = self.get_awake_edges(dirty_ids)
+        # группа ребра - остаток от деления id его плитки на количество групп
+        edge_groups = tile_ids % groups_amount
+        order = numpy.argsort(edge_groups, kind = "stable")
+        self.sharing_edges = (tile_ids[order], neighbor_ids[order])
+        self.sharing_bounds = numpy.searchsorted(edge_groups[order], numpy.arange(groups_amount + 1))
+
+    def reset_sharing(self) -> None:
+        """Прерывает период перемещения ресурсов - его плитки будут обработаны в следующем периоде."""
+
+        if self.sharing_edges is not None:
+            for ids in self.sharing_edges:
+                self.dirty[ids] = True
+            self.sharing_edges = None
+            self.sharing_bounds = None
+
+    def share_resources(self, coeff: float, threshold: int = 0, group: int = 0, groups_amount: int = 1) -> None:
+        """
+        Перемещает ресурсы между соседними плитками пропорционально их разнице.
+        Обрабатываются только ребра, касающиеся измененных плиток. Плитка перестает считаться измененной,
+        когда перемещения по всем ее ребрам не превышают threshold.
+        Ребра делятся на groups_amount групп, за вызов обрабатывается одна группа,
+        а период начинается с нулевой группы.
+        """
+
+        if group == 0:
+            self.start_sharing(groups_amount)
+        # период прерван - обработка возобновится со следующего периода
+        elif self.sharing_edges is None:
+            return
+
+        start = self.sharing_bounds[group]
+        stop = self.sharing_bounds[group + 1]
+        tile_ids = self.sharing_edges[0][start:stop]
+        neighbor_ids = self.sharing_edges[1][start:stop]
+        flow = self.get_flow(tile_ids, neighbor_ids, coeff)
+        self.move_resources(tile_ids, neighbor_ids, flow)
+
+        not_converged = numpy.abs(flow).max(axis = 1, initial = 0) > threshold
+        self.dirty[tile_ids[not_converged]] = True
+        self.dirty[neighbor_ids[not_converged]] = True
+
+        if group == groups_amount - 1:
+            self.sharing_edges = None
+            self.sharing_bounds = None
+
+    def share_resources_implicit(self, tau: float, threshold: int = 0) -> None:
+        """
+        Перемещает ресурсы между соседними плитками неявным методом Эйлера за весь период (diffuse_implicit).
+        Обрабатываются только ребра, касающиеся измененных плиток.
+        Плитка перестает считаться измененной, когда ее ресурсы изменились не больше чем на threshold.
+        """
+
+        self.start_sharing(1)
+        tile_ids, neighbor_ids = self.sharing_edges
+        self.sharing_edges = None
+        self.sharing_bounds = None
+        node_ids, change = self.diffuse_implicit(tile_ids, neighbor_ids, tau)
+        self.dirty[node_ids[numpy.abs(change).max(axis = 1, initial = 0) > threshold]] = True
+
+    def diffuse_implicit(
+            self,
+            tile_ids: numpy.ndarray,
+            neighbor_ids: numpy.ndarray,
+            tau: float
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Перемещает ресурсы по ребрам неявным методом Эйлера - решает (I + tau * L) x = b,
+        где L - лапласиан графа ребер. Метод устойчив при любом tau.
+        Одно явное перемещение с коэффициентом coeff (share_resources) соответствует tau = 2 * coeff.
+        Возвращает id плиток, которых касаются ребра, и изменения их ресурсов.
+        """
+
+        if len(tile_ids) == 0:
+            return tile_ids, numpy.zeros((0, RESOURCES_AMOUNT), numpy.int64)
+
+        # система решается только для плиток, которых касаются ребра
+        node_ids, nodes = numpy.unique(numpy.concatenate((tile_ids, neighbor_ids)), return_inverse = True)
+        edges_amount = len(tile_ids)
+        old_resources = self.resources[node_ids]
+        new_resources = self.solve_diffusion(
+            nodes[:edges_amount],
+            nodes[edges_amount:],
+            old_resources.astype(numpy.float64),
+            tau
+        )
+
+        # округление с наибольшими остатками - сумма ресурсов на карте не меняется
+        new_resources = ResourcesBatch.from_array(new_resources).clamp(0).array
+        rounded_resources = numpy.floor(new_resources).astype(numpy.int64)
+        remainders = new_resources - rounded_resources
+        deficits = old_resources.sum(axis = 0) - rounded_resources.sum(axis = 0)
+        for resource_index, deficit in enumerate(deficits.tolist()):
+            top_ids = numpy.argsort(-remainders[:, resource_index], kind = "stable")[:max(deficit, 0)]
+            rounded_resources[top_ids, resource_index] += 1
+
+        change = rounded_resources - old_resources
+        self.resources[node_ids] = rounded_resources
+        self.active_ids.update(node_ids[change.any(axis = 1)].tolist())
+        return node_ids, change
+
+    @staticmethod
+    def solve_diffusion(
+            first_nodes: numpy.ndarray,
+            second_nodes: numpy.ndarray,
+            values: numpy.ndarray,
+            tau: float,
+            tolerance: float = 1e-9
+    ) -> numpy.ndarray:
+        """
+        Решает (I + tau * L) x = values методом сопряженных градиентов для каждого столбца values,
+        где L - лапласиан графа с ребрами (first_nodes[i], second_nodes[i]).
+        """
+
+        def multiply(vectors: numpy.ndarray) -> numpy.ndarray:
+            flow = (vectors[first_nodes] - vectors[second_nodes]) * tau
+            product = vectors.copy()
+            numpy.add.at(product, first_nodes, flow)
+            numpy.subtract.at(product, second_nodes, flow)
+            return product
+
+        # матрица симметрична и положительно определена, поэтому метод сходится не более чем за len(values) итераций
+        solution = values.copy()
+        residual = values - multiply(solution)
+        direction = residual.copy()
+        residual_norms = (residual**2).sum(axis = 0)
+        limits = tolerance**2 * (values**2).sum(axis = 0)
+        for _ in range(len(values)):
+            if (residual_norms <= limits).all():
+                break
+            product = multiply(direction)
+            curvatures = (direction * product).sum(axis = 0)
+            steps = numpy.divide(residual_norms, curvatures, numpy.zeros_like(curvatures), where = curvatures > 0)
+            solution += steps * direction
+            residual -= steps * product
+            new_residual_norms = (residual**2).sum(axis = 0)
+            coeffs = numpy.divide(
+                new_residual_norms,
+                residual_norms,
+                numpy.zeros_like(residual_norms),
+                where = residual_norms > 0
+            )
+            direction = residual + coeffs * direction
+            residual_norms = new_residual_norms
+        return solution
+
+    def get_resources(self, tile_id: int) -> VectorResources[int]:
+        """Ресурсы плитки - изменения контейнера отражаются в хранилище."""
+
+        # контейнер может быть изменен, поэтому плитка считается измененной
+        self.dirty[tile_id] = True
+        self.active_ids.add(tile_id)
+        return VectorResources.from_array(self.resources[tile_id])
+
+    def energy_field(self, tile_ids: numpy.ndarray | int) -> numpy.ndarray | int:
+        """Энергия, доступная на плитках за тик, - вычисляется из параметров плиток и не хранится."""
+
+        return self.default_amounts[tile_ids]
+
+    def get_available_resources(self, tile_id: int) -> VectorResources[int]:
+        """Ресурсы, которые можно забрать с плитки, вместе с энергией."""
+
+        available = VectorResources.from_array(self.resources[tile_id].copy())
+        available[ENERGY] = int(self.energy_field(tile_id))
+        return available
+
+    def take_resources(self, tile_id: int, resources: Resources[int]) -> None:
+        """Забирает ресурсы с плитки сразу - энергия берется из поля энергии и не вычитается."""
+
+        taken = Resources.to_array(resources).copy()
+        taken[ENERGY] = 0
+        self.resources[tile_id] -= taken
+        self.dirty[tile_id] = True
+        self.active_ids.add(tile_id)
+        self.ledger.map -= VectorResources.from_array(taken)
+
+    def request_resources(self, tile_id: int, creature: "Creature", resources: Resources[int]) -> None:
+        """Регистрирует запрос существа на получение ресурсов с плитки - контейнер обнуляется после обработки."""
+
+        self.remove_requests_tiles.append(tile_id)
+        self.active_ids.add(tile_id)
+        self.remove_requests_creatures.append(creature)
+        self.remove_requests_resources.append(resources)
+
+    def return_resources(self, tile_id: int, resources: Resources[int]) -> None:
+        """Возвращает ресурсы существа на плитку - контейнер обнуляется сразу."""
+
+        self.returned_resources[tile_id] += Resources.to_array(resources)
+        # энергия плиток задается полем энергии, поэтому возвращенная энергия рассеивается
+        self.returned_resources[tile_id, ENERGY] = 0
+        self.dirty[tile_id] = True
+        self.active_ids.add(tile_id)
+        resources.clear()
+
+    def on_update(self) -> None:
+        """Обновляет только активные плитки."""
+
+        if len(self.active_ids) == 0:
+            return
+
+        self.process_remove_requests()
+        tile_ids = numpy.fromiter(self.active_ids, numpy.intp, len(self.active_ids))
+        self.active_ids.clear()
+
+        # получение ресурсов от существ
+        returned = self.returned_resources[tile_ids]
+        self.ledger.map += VectorResources.from_array(returned.sum(axis = 0))
+        self.resources[tile_ids] += returned
+        self.returned_resources[tile_ids] = 0
+
+        resources = ResourcesBatch.from_array(self.resources[tile_ids])
+        if not resources.min().is_nonnegative():
+            tile_id = int(tile_ids[resources.array.min(axis = 1).argmin()])
+            raise ValueError(
+                f"Resource amount can not be below zero, but there is {self.get_resources(tile_id)} "
+                f"on {self.tiles[tile_id]}."
+            )
+
+    def process_remove_requests(self) -> None:
+        """Выдает ресурсы существам - все запросы тика обрабатываются вместе."""
+
+        if len(self.remove_requests_tiles) > 0:
+            requested = ResourcesBatch.from_iterable(self.remove_requests_resources)
+            # ресурсы, для которых у существа нет хранилища, не выдаются
+            capacity = ResourcesBatch.from_iterable(x.storage.capacity for x in self.remove_requests_creatures)
+            requested.array[capacity.array <= 0] = 0
+
+            # при нехватке ресурса он делится между существами одной плитки пропорционально запросам
+            tile_ids, groups = numpy.unique(numpy.array(self.remove_requests_tiles, numpy.intp), return_inverse = True)
+            available = self.resources[tile_ids]
+            available[:, ENERGY] = self.energy_field(tile_ids)
+            removed = requested.split_by_groups(groups, available)
+
+            for creature, creature_request, removed_resources in \
+                    zip(self.remove_requests_creatures, self.remove_requests_resources, removed):
+                creature.storage.add_resources(removed_resources)
+                # контейнер запроса принадлежит существу и переиспользуется им
+                creature_request.clear()
+
+            # энергия выдается из поля энергии и с плиток не вычитается
+            taken = removed.array.copy()
+            taken[:, ENERGY] = 0
+            numpy.subtract.at(self.resources, tile_ids[groups], taken)
+            self.dirty[tile_ids] = True
+            self.ledger.map -= VectorResources.from_array(taken.sum(axis = 0))
+
+            self.remove_requests_tiles.clear()
+            self.remove_requests_creatures.clear()
+            self.remove_requests_resources.clear()
@@ -1,5 +1,8 @@
+import copy
 from collections import defaultdict
-from typing import Callable, Iterable, Iterator, TypeVar
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
+
+import numpy
 
 from core.service import ObjectDescriptionReader
 from evolution import settings
@@ -65,12 +68,25 @@ RESOURCE_DICT = dict(
     )
 )
 RESOURCE_LIST = [x for x in RESOURCE_DICT.values()]
+# длина массивов ресурсов (индекс в массиве - WorldResource)
+RESOURCES_AMOUNT = int(max(RESOURCE_LIST)) + 1
 ENERGY = RESOURCE_DICT["energy"]
 
 VT = TypeVar("VT", int, float)
 
+# дробные количества ресурсов хранятся целыми числами с фиксированной точкой (количество * FIXED_POINT_SCALE)
+FIXED_POINT_SHIFT = 16
+FIXED_POINT_SCALE = 1 << FIXED_POINT_SHIFT
+FIXED_POINT_FRACTION_MASK = FIXED_POINT_SCALE - 1
+
+
+def to_fixed_point(amount: int | float) -> int:
+    """Переводит количество в представление с фиксированной точкой."""
+
+    return round(amount * FIXED_POINT_SCALE)
 
-class Resources(defaultdict[WorldResource, VT]):
+
+class DictResources(defaultdict[WorldResource, VT]):
     """Обертка-контейнер для удобной работы с ресурсами."""
 
     def __init__(self, *args):
@@ -82,7 +98,7 @@ class Resources(defaultdict[WorldResource, VT]):
             super().__init__(int, *args)
 
     def __repr__(self) -> str:
-        string = f"{self.__class__.__name__}: "
+        string = "Resources: "
         if len(self) > 0:
             for resource, amount in self.items():
                 string += f"{resource.formula}: {amount}, "
@@ -92,6 +108,17 @@ class Resources(defaultdict[WorldResource, VT]):
             string += "empty"
         return string
 
+    @classmethod
+    def from_array(cls, array: numpy.ndarray) -> "DictResources":
+        amounts = array.tolist()
+        return cls({resource: amounts[resource] for resource in RESOURCE_LIST})
+
+    @staticmethod
+    def to_array(resources: "Resources") -> numpy.ndarray:
+        """Возвращает массив количеств ресурсов для контейнера любого типа."""
+
+        return VectorResources.to_array(resources)
+
     def __add__(self, other: "Resources") -> "Resources":
         new = self.copy()
         new += other
@@ -157,7 +184,7 @@ class Resources(defaultdict[WorldResource, VT]):
 
     @classmethod
     def sum(cls, resources_iterable: Iterable["Resources"]) -> "Resources":
-        resources_sum = Resources()
+        resources_sum = cls()
         for resources in resources_iterable:
             resources_sum += resources
         return resources_sum
@@ -171,3 +198,575 @@ class Resources(defaultdict[WorldResource, VT]):
     def fill_all(self, amount: int | float) -> None:
         for resource in RESOURCE_LIST:
             self[resource] = amount
+
+    def freeze(self) -> "FrozenDictResources[VT]":
+        """Возвращает неизменяемую копию."""
+
+        return FrozenDictResources(self)
+
+    # методы ниже изменяют контейнер на месте и не создают промежуточных контейнеров
+
+    def assign(self, other: "Resources") -> "DictResources":
+        """Заменяет количества ресурсов количествами из other."""
+
+        self.clear()
+        self.update(other.items())
+        return self
+
+    def iadd_scaled(self, other: "Resources", coeff: int | float) -> "DictResources":
+        """self += other * coeff"""
+
+        for resource, amount in other.items():
+            self[resource] += amount * coeff
+        return self
+
+    def isub_clamped(
+            self,
+            other: "Resources",
+            minimum: int | float | None = None,
+            maximum: int | float | None = None
+    ) -> "DictResources":
+        """Вычитает other и ограничивает все количества значениями minimum и maximum."""
+
+        for resource, amount in other.items():
+            self[resource] -= amount
+        for resource, amount in self.items():
+            if minimum is not None and amount < minimum:
+                self[resource] = minimum
+            elif maximum is not None and amount > maximum:
+                self[resource] = maximum
+        return self
+
+    def imul_round(self, multiplier: int | float) -> "DictResources[int]":
+        """Умножает и округляет количества ресурсов."""
+
+        for resource, amount in self.items():
+            self[resource] = round(amount * multiplier)
+        return self
+
+    def iminimum(self, other: "Resources | int | float") -> "DictResources":
+        """Ограничивает количества сверху - числом или количествами из other."""
+
+        if isinstance(other, int | float):
+            for resource, amount in self.items():
+                if amount > other:
+                    self[resource] = other
+        else:
+            for resource, amount in self.items():
+                if amount > (other_amount := other.get(resource, 0)):
+                    self[resource] = other_amount
+        return self
+
+    def imask(self, mask: "Resources") -> "DictResources":
+        """Обнуляет ресурсы, количество которых в mask равно нулю."""
+
+        for resource in self.keys():
+            if mask.get(resource, 0) == 0:
+                self[resource] = 0
+        return self
+
+    def move_fixed_point_integer_part(self, target: "Resources[int]") -> "Resources[int]":
+        """
+        Переносит целую часть количеств с фиксированной точкой в target (как обычные количества),
+        оставляя в контейнере только дробную.
+        """
+
+        target.clear()
+        for resource, amount in self.items():
+            target[resource] = amount >> FIXED_POINT_SHIFT
+            self[resource] = amount & FIXED_POINT_FRACTION_MASK
+        return target
+
+    def is_nonnegative(self) -> bool:
+        for amount in self.values():
+            if amount < 0:
+                return False
+        return True
+
+    def total(self) -> VT:
+        return sum(self.values())
+
+
+class VectorResources(Generic[VT]):
+    """
+    Обертка-контейнер для работы с ресурсами, хранящая количества в массиве фиксированной длины.
+    Индекс в массиве - WorldResource, поэтому арифметические операции выполняются поэлементно, без хэширования.
+    """
+
+    __slots__ = ("array",)
+
+    def __init__(self, *args) -> None:
+        self.array: numpy.ndarray = numpy.zeros(RESOURCES_AMOUNT, numpy.int64)
+        # совместимость с DictResources (Resources(int, {...}))
+        if args and callable(args[0]):
+            args = args[1:]
+        if args:
+            for resource, amount in dict(*args).items():
+                self[resource] = amount
+
+    def __repr__(self) -> str:
+        string = "Resources: "
+        if len(self) > 0:
+            string += ", ".join(f"{resource.formula}: {amount}" for resource, amount in self.items())
+        else:
+            string += "empty"
+        return string
+
+    @classmethod
+    def from_array(cls, array: numpy.ndarray) -> "VectorResources":
+        """Создает контейнер поверх переданного массива (без копирования)."""
+
+        obj = cls.__new__(cls)
+        obj.array = array
+        return obj
+
+    @staticmethod
+    def to_array(resources: "Resources") -> numpy.ndarray:
+        """Возвращает массив количеств ресурсов для контейнера любого типа."""
+
+        if isinstance(resources, VectorResources):
+            array = resources.array
+        else:
+            array = numpy.zeros(RESOURCES_AMOUNT, numpy.int64)
+            for resource, amount in resources.items():
+                if isinstance(amount, float) and array.dtype.kind != "f":
+                    array = array.astype(numpy.float64)
+                array[resource] = amount
+        return array
+
+    def set_array(self, array: numpy.ndarray) -> None:
+        """Записывает значения массива в контейнер, повышая тип до float при необходимости."""
+
+        if array.dtype.kind == "f" and self.array.dtype.kind != "f":
+            self.array = array.astype(numpy.float64)
+        else:
+            self.array[:] = array
+
+    def __getitem__(self, resource: WorldResource) -> VT:
+        return self.array.item(resource)
+
+    def __setitem__(self, resource: WorldResource, amount: VT) -> None:
+        if isinstance(amount, float) and self.array.dtype.kind != "f":
+            self.array = self.array.astype(numpy.float64)
+        self.array[resource] = amount
+
+    def __delitem__(self, resource: WorldResource) -> None:
+        self.array[resource] = 0
+
+    def __contains__(self, resource: WorldResource) -> bool:
+        return self.array.item(resource) != 0
+
+    def __len__(self) -> int:
+        return int(numpy.count_nonzero(self.array))
+
+    def __iter__(self) -> Iterator[WorldResource]:
+        amounts = self.array.tolist()
+        return iter(resource for resource in RESOURCE_LIST if amounts[resource] != 0)
+
+    def keys(self) -> list[WorldResource]:
+        return RESOURCE_LIST
+
+    def values(self) -> list[VT]:
+        amounts = self.array.tolist()
+        return [amounts[resource] for resource in RESOURCE_LIST]
+
+    def items(self) -> Iterator[tuple[WorldResource, VT]]:
+        amounts = self.array.tolist()
+        return ((resource, amounts[resource]) for resource in RESOURCE_LIST)
+
+    def copy(self) -> "VectorResources[VT]":
+        return self.from_array(self.array.copy())
+
+    def __copy__(self) -> "VectorResources[VT]":
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict) -> "VectorResources[VT]":
+        return self.from_array(copy.deepcopy(self.array, memo))
+
+    def __add__(self, other: "Resources") -> "VectorResources":
+        return self.from_array(self.array + self.to_array(other))
+
+    def __iadd__(self, other: "Resources") -> "VectorResources":
+        other_array = self.to_array(other)
+        if other_array.dtype.kind == "f" and self.array.dtype.kind != "f":
+            self.array = self.array + other_array
+        else:
+            self.array += other_array
+        return self
+
+    def __sub__(self, other: "Resources") -> "VectorResources":
+        return self.from_array(self.array - self.to_array(other))
+
+    def __isub__(self, other: "Resources") -> "VectorResources":
+        other_array = self.to_array(other)
+        if other_array.dtype.kind == "f" and self.array.dtype.kind != "f":
+            self.array = self.array - other_array
+        else:
+            self.array -= other_array
+        return self
+
+    def __mul__(self, multiplier: int | float) -> "VectorResources":
+        return self.from_array(self.array * multiplier)
+
+    def __imul__(self, multiplier: int | float) -> "VectorResources":
+        if isinstance(multiplier, float) and self.array.dtype.kind != "f":
+            self.array = self.array * multiplier
+        else:
+            self.array *= multiplier
+        return self
+
+    def __truediv__(self, divisor: int | float) -> "VectorResources[float]":
+        return self.from_array(self.array / divisor)
+
+    def __itruediv__(self, divisor: int | float) -> "VectorResources[float]":
+        self.array = self.array / divisor
+        return self
+
+    def __floordiv__(self, divisor: int | float) -> "VectorResources[int]":
+        return self.from_array(self.array // divisor)
+
+    def __ifloordiv__(self, divisor: int | float) -> "VectorResources[int]":
+        self.array = self.array // divisor
+        return self
+
+    def __neg__(self) -> "VectorResources[VT]":
+        return self.from_array(-self.array)
+
+    # отбрасывает дробную часть, как и DictResources.round
+    def round(self) -> "VectorResources[int]":
+        return self.from_array(self.array.astype(numpy.int64))
+
+    def iround(self) -> "VectorResources[int]":
+        if self.array.dtype.kind == "f":
+            self.array = numpy.rint(self.array).astype(numpy.int64)
+        return self
+
+    @classmethod
+    def sum(cls, resources_iterable: Iterable["Resources"]) -> "VectorResources":
+        resources_sum = cls()
+        for resources in resources_iterable:
+            resources_sum += resources
+        return resources_sum
+
+    def isum(self, resources_iterable: Iterable["Resources"]) -> "VectorResources":
+        host = self
+        for resources in resources_iterable:
+            host += resources
+        return host
+
+    def fill_all(self, amount: int | float) -> None:
+        self.array = numpy.full(RESOURCES_AMOUNT, amount, numpy.float64 if isinstance(amount, float) else numpy.int64)
+
+    def freeze(self) -> "FrozenVectorResources[VT]":
+        """Возвращает неизменяемую копию."""
+
+        frozen = FrozenVectorResources.__new__(FrozenVectorResources)
+        frozen.array = self.array.copy()
+        frozen.array.flags.writeable = False
+        return frozen
+
+    # методы ниже изменяют контейнер на месте и не создают промежуточных контейнеров
+
+    # все ресурсы всегда присутствуют в контейнере, поэтому default не используется
+    def get(self, resource: WorldResource, default: VT = 0) -> VT:
+        return self.array.item(resource)
+
+    def clear(self) -> None:
+        self.array.fill(0)
+
+    def assign(self, other: "Resources") -> "VectorResources":
+        """Заменяет количества ресурсов количествами из other."""
+
+        self.set_array(self.to_array(other))
+        return self
+
+    def iadd_scaled(self, other: "Resources", coeff: int | float) -> "VectorResources":
+        """self += other * coeff"""
+
+        other_array = self.to_array(other)
+        if (isinstance(coeff, float) or other_array.dtype.kind == "f") and self.array.dtype.kind != "f":
+            self.array = self.array + other_array * coeff
+        else:
+            self.array += other_array * coeff
+        return self
+
+    def isub_clamped(
+            self,
+            other: "Resources",
+            minimum: int | float | None = None,
+            maximum: int | float | None = None
+    ) -> "VectorResources":
+        """Вычитает other и ограничивает все количества значениями minimum и maximum."""
+
+        self -= other
+        if minimum is not None or maximum is not None:
+            numpy.clip(self.array, minimum, maximum, out = self.array)
+        return self
+
+    def imul_round(self, multiplier: int | float) -> "VectorResources[int]":
+        """Умножает и округляет количества ресурсов."""
+
+        if self.array.dtype.kind == "f":
+            self.array = numpy.rint(self.array * multiplier).astype(numpy.int64)
+        elif isinstance(multiplier, float):
+            self.array[:] = numpy.rint(self.array * multiplier)
+        else:
+            self.array *= multiplier
+        return self
+
+    def iminimum(self, other: "Resources | int | float") -> "VectorResources":
+        """Ограничивает количества сверху - числом или количествами из other."""
+
+        if isinstance(other, int | float):
+            numpy.minimum(self.array, other, out = self.array)
+        else:
+            numpy.minimum(self.array, self.to_array(other), out = self.array)
+        return self
+
+    def imask(self, mask: "Resources") -> "VectorResources":
+        """Обнуляет ресурсы, количество которых в mask равно нулю."""
+
+        self.array[self.to_array(mask) == 0] = 0
+        return self
+
+    def move_fixed_point_integer_part(self, target: "Resources[int]") -> "Resources[int]":
+        """
+        Переносит целую часть количеств с фиксированной точкой в target (как обычные количества),
+        оставляя в контейнере только дробную.
+        """
+
+        numpy.right_shift(self.array, FIXED_POINT_SHIFT, out = target.array)
+        numpy.bitwise_and(self.array, FIXED_POINT_FRACTION_MASK, out = self.array)
+        return target
+
+    def is_nonnegative(self) -> bool:
+        return bool(self.array.min() >= 0)
+
+    def total(self) -> VT:
+        return self.array.sum().item()
+
+
+# методы, изменяющие контейнер ресурсов
+MUTATING_METHODS = (
+    "__setitem__", "__delitem__",
+    "__iadd__", "__isub__", "__imul__", "__itruediv__", "__ifloordiv__",
+    "iround", "isum", "fill_all", "clear", "assign", "set_array",
+    "iadd_scaled", "isub_clamped", "imul_round", "iminimum", "imask", "move_fixed_point_integer_part"
+)
+
+
+def not_available_method_factory(name: str) -> Callable[..., None]:
+    def not_available_method(self, *_) -> None:
+        raise NotImplementedError(f"{name} is not available for frozen resources.")
+
+    return not_available_method
+
+
+class FrozenDictResources(DictResources[VT]):
+    """Неизменяемый DictResources, который может использоваться многими объектами одновременно."""
+
+    # отсутствующий ресурс не добавляется в контейнер при чтении
+    def __missing__(self, resource: WorldResource) -> VT:
+        return 0
+
+    @classmethod
+    def from_array(cls, array: numpy.ndarray) -> DictResources:
+        return DictResources.from_array(array)
+
+    # копии и результаты операций изменяемы
+    def copy(self) -> DictResources:
+        return DictResources(self)
+
+    def __copy__(self) -> DictResources:
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict) -> DictResources:
+        return self.copy()
+
+    def __mul__(self, multiplier: int | float) -> DictResources:
+        return self.copy() * multiplier
+
+    def __truediv__(self, divisor: int | float) -> DictResources[float]:
+        return self.copy() / divisor
+
+    def __floordiv__(self, divisor: int | float) -> DictResources[int]:
+        return self.copy() // divisor
+
+    def __neg__(self) -> DictResources:
+        return -self.copy()
+
+    def round(self) -> DictResources[int]:
+        return self.copy().round()
+
+    def freeze(self) -> "FrozenDictResources":
+        return self
+
+
+for method_name in (*MUTATING_METHODS, "update", "pop", "popitem", "setdefault"):
+    setattr(FrozenDictResources, method_name, not_available_method_factory(method_name))
+
+
+class FrozenVectorResources(VectorResources[VT]):
+    """Неизменяемый VectorResources, который может использоваться многими объектами одновременно."""
+
+    __slots__ = ()
+
+    # копии и результаты операций изменяемы
+    @classmethod
+    def from_array(cls, array: numpy.ndarray) -> VectorResources:
+        return VectorResources.from_array(array)
+
+    def freeze(self) -> "FrozenVectorResources":
+        return self
+
+
+for method_name in MUTATING_METHODS:
+    setattr(FrozenVectorResources, method_name, not_available_method_factory(method_name))
+
+
+class ResourcesBatch:
+    """
+    Матрица ресурсов - N векторов ресурсов в одном двумерном массиве (строка - сущность, столбец - WorldResource).
+    Позволяет выполнять сводные операции над ресурсами многих сущностей за одну операцию.
+    """
+
+    __slots__ = ("array",)
+
+    def __init__(self, size: int, dtype: type = numpy.int64) -> None:
+        self.array: numpy.ndarray = numpy.zeros((size, RESOURCES_AMOUNT), dtype)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}: {len(self)}"
+
+    def __len__(self) -> int:
+        return self.array.shape[0]
+
+    def __iter__(self) -> Iterator["Resources"]:
+        return (Resources.from_array(row) for row in self.array)
+
+    @classmethod
+    def from_array(cls, array: numpy.ndarray) -> "ResourcesBatch":
+        obj = cls.__new__(cls)
+        obj.array = array
+        return obj
+
+    @classmethod
+    def from_iterable(cls, resources_iterable: Iterable["Resources"]) -> "ResourcesBatch":
+        rows = [VectorResources.to_array(resources) for resources in resources_iterable]
+        if len(rows) > 0:
+            batch = cls.from_array(numpy.vstack(rows))
+        else:
+            batch = cls(0)
+        return batch
+
+    def sum(self) -> "Resources":
+        """Сумма всех строк."""
+
+        return Resources.from_array(self.array.sum(axis = 0))
+
+    def min(self) -> "Resources":
+        """Минимальное количество каждого ресурса среди всех строк."""
+
+        if len(self) > 0:
+            minimum = self.array.min(axis = 0)
+        else:
+            minimum = numpy.zeros(RESOURCES_AMOUNT, self.array.dtype)
+        return Resources.from_array(minimum)
+
+    def clamp(self, minimum: int | float | None = 0, maximum: int | float | None = None) -> "ResourcesBatch":
+        """Ограничивает все количества на месте."""
+
+        numpy.clip(self.array, minimum, maximum, out = self.array)
+        return self
+
+    def split_by_groups(self, groups: numpy.ndarray, totals: numpy.ndarray) -> "ResourcesBatch":
+        """
+        Делит totals[group] между строками группы пропорционально их количествам (строки - запросы).
+        Ресурсы, запрошенные в группе в количестве не большем, чем есть в totals[group], выдаются полностью.
+        При нехватке распределяется все доступное количество - округление по методу наибольшего остатка.
+        """
+
+        requested = self.array
+        demand = numpy.zeros_like(totals)
+        numpy.add.at(demand, groups, requested)
+        row_demand = demand[groups]
+        row_total = totals[groups]
+        lack = row_demand > row_total
+        if not lack.any():
+            return self.from_array(requested.copy())
+
+        numerator = requested * row_total
+        row_demand = numpy.maximum(row_demand, 1)
+        remainder = numerator % row_demand
+        shares = numpy.where(lack, numerator // row_demand, requested)
+
+        # нераспределенный остаток каждой группы отдается строкам с наибольшими дробными частями
+        allocated = numpy.zeros_like(totals)
+        numpy.add.at(allocated, groups, shares)
+        leftover = totals - allocated
+        for column in range(RESOURCES_AMOUNT):
+            rows = numpy.flatnonzero(lack[:, column])
+            if len(rows) > 0:
+                # сортировка по группе, а внутри группы - по убыванию остатка
+                rows = rows[numpy.lexsort((-remainder[rows, column], groups[rows]))]
+                row_groups = groups[rows]
+                group_starts = numpy.flatnonzero(numpy.r_[True, row_groups[1:] != row_groups[:-1]])
+                group_sizes = numpy.diff(numpy.r_[group_starts, len(rows)])
+                rank = numpy.arange(len(rows)) - numpy.repeat(group_starts, group_sizes)
+                shares[rows[rank < leftover[row_groups, column]], column] += 1
+        return self.from_array(shares)
+
+
+RESOURCES_CLASSES: dict[str, type[DictResources | VectorResources]] = {
+    "dict": DictResources,
+    "vector": VectorResources
+}
+# реализация контейнера ресурсов, используемая во всей симуляции
+Resources = RESOURCES_CLASSES[settings.RESOURCES_BACKEND]
+
+
+class ResourcesLedger:
+    """
+    Учет ресурсов мира.
+    Плитки, хранилища и части тела сообщают об изменениях своих ресурсов,
+    поэтому суммы всегда актуальны и не требуют полного пересчета.
+    """
+
+    def __init__(self) -> None:
+        # ресурсы на карте
+        self.map = Resources[int]()
+        self.map.fill_all(0)
+        # ресурсы у существ = ресурсы в хранилищах существ + ресурсы в телах существ
+        self.creatures = Resources[int]()
+        self.creatures.fill_all(0)
+        # ресурсы, появившиеся в мире или пропавшие из него при изменении карты
+        # без учета энергии должны совпадать с ресурсами мира
+        self.injected = Resources[int]()
+        self.injected.fill_all(0)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(map: {self.map}, creatures: {self.creatures})"
+
+    @property
+    def world(self) -> Resources[int]:
+        """Все ресурсы = ресурсы у существ + ресурсы на карте."""
+
+        return self.map + self.creatures
+
+    def check(self, map_resources: Resources[int], creature_resources: Resources[int]) -> None:
+        """Сверяет учет с полным пересчетом ресурсов."""
+
+        if not (numpy.array_equal(Resources.to_array(self.map), Resources.to_array(map_resources))
+                and numpy.array_equal(Resources.to_array(self.creatures), Resources.to_array(creature_resources))):
+            raise ValueError(
+                f"Resources ledger {self} does not match recount (map: {map_resources}, "
+                f"creatures: {creature_resources})."
+            )
+
+    def check_conservation(self) -> None:
+        """Проверяет, что вещества (все ресурсы, кроме энергии) не появляются и не исчезают."""
+
+        difference = Resources.to_array(self.world) - Resources.to_array(self.injected)
+        difference[ENERGY] = 0
+        if difference.any():
+            raise ValueError(f"Resources are not conserved: {self.world} instead of {self.injected} (without energy).")
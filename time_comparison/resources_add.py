@@ -6,7 +6,7 @@ import operator
 import random
 from typing import Any, Callable
 
-from simulator.world_resource import RESOURCE_LIST, Resources
+from simulator.world_resource import DictResources as Resources, RESOURCE_LIST
 
 
 class ResourcesReal(Resources):
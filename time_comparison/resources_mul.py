@@ -2,7 +2,7 @@ import datetime
 import random
 from typing import Any, Callable
 
-from simulator.world_resource import RESOURCE_LIST, Resources
+from simulator.world_resource import DictResources as Resources, RESOURCE_LIST
 
 
 start_all = datetime.datetime.now()